@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+
+
+class ApkIndex(object):
+    """
+    keeps track of the apks that were downloaded, with their version code, size and digests and the other files
+    of the app, like its splits, so a newer version of an app can be patched from the stored one.
+    an apk that is not verified was found on disk, and its version is a guess that still has to be confirmed
+    by the digests of the delivery data before the apk counts as downloaded.
+    it also keeps the apps that are waiting to be downloaded, with the amount of times their download failed,
+    so they can be downloaded after a restart
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS apks '
+                        '(package TEXT PRIMARY KEY, version_code INTEGER, size INTEGER, sha1 TEXT, sha256 TEXT, '
+                        'verified INTEGER)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS files (package TEXT, path TEXT, size INTEGER)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS files_package ON files (package)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS queue '
+                        '(package TEXT PRIMARY KEY, version_code INTEGER, attempts INTEGER DEFAULT 0)')
+        self.db.commit()
+
+    def get(self, package_name):
+        """
+        :param package_name: the app to look up
+        :return: a dict with the version_code, size, hex sha1 and sha256 and verified flag of the stored apk and
+                 the (path, size) tuples of the other files of the app, or None if the app was not downloaded
+        """
+
+        with self.lock:
+            row = self.db.execute('SELECT version_code, size, sha1, sha256, verified FROM apks WHERE package = ?',
+                                  (package_name,)).fetchone()
+            files = self.db.execute('SELECT path, size FROM files WHERE package = ?', (package_name,)).fetchall()
+        if row is None:
+            return None
+        return {'version_code': row[0], 'size': row[1], 'sha1': row[2], 'sha256': row[3], 'verified': bool(row[4]),
+                'files': files}
+
+    def put(self, package_name, version_code, size, sha1, sha256, files=(), verified=True):
+        """
+        :param package_name: the app that was downloaded
+        :param version_code: the version of the app that was downloaded
+        :param size: the size of the apk in bytes
+        :param sha1: the hex sha1 of the apk
+        :param sha256: the hex sha256 of the apk
+        :param files: a list of (path, size) tuples of the other files of the app, like its splits and obb files
+        :param verified: False if the version of the apk is not confirmed by the delivery data
+        """
+
+        with self.lock:
+            self.db.execute('INSERT OR REPLACE INTO apks VALUES (?, ?, ?, ?, ?, ?)',
+                            (package_name, version_code, size, sha1, sha256, int(verified)))
+            self.db.execute('DELETE FROM files WHERE package = ?', (package_name,))
+            self.db.executemany('INSERT INTO files VALUES (?, ?, ?)', [(package_name, path, file_size)
+                                                                       for path, file_size in files])
+            self.db.commit()
+
+    def enqueue(self, package_name, version_code):
+        """
+        :param package_name: an app that is waiting to be downloaded
+        :param version_code: the version of the app to download. the failed attempts are counted again for a new version
+        """
+
+        with self.lock:
+            self.db.execute('INSERT INTO queue VALUES (?, ?, 0) ON CONFLICT (package) DO UPDATE SET '
+                            'attempts = CASE WHEN version_code = excluded.version_code THEN attempts ELSE 0 END, '
+                            'version_code = excluded.version_code', (package_name, version_code))
+            self.db.commit()
+
+    def dequeue(self, package_name):
+        """
+        :param package_name: an app that was downloaded
+        """
+
+        with self.lock:
+            self.db.execute('DELETE FROM queue WHERE package = ?', (package_name,))
+            self.db.commit()
+
+    def failed(self, package_name):
+        """
+        :param package_name: an app that is still waiting to be downloaded after a failed attempt
+        """
+
+        with self.lock:
+            self.db.execute('UPDATE queue SET attempts = attempts + 1 WHERE package = ?', (package_name,))
+            self.db.commit()
+
+    def queued(self, max_attempts=None):
+        """
+        :param max_attempts: leave out the apps whose download failed this many times, None to include all apps
+        :return: a list of (package_name, version_code) tuples of the apps that are waiting to be downloaded
+        """
+
+        with self.lock:
+            if max_attempts is None:
+                return self.db.execute('SELECT package, version_code FROM queue').fetchall()
+            return self.db.execute('SELECT package, version_code FROM queue WHERE attempts < ?',
+                                   (max_attempts,)).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
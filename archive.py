@@ -0,0 +1,165 @@
+import os
+import zlib
+import struct
+import sqlite3
+import logging
+import threading
+import apkfetch_pb2
+from google.protobuf.message import DecodeError
+
+ARCHIVE_COMPRESSION_LEVEL = 6  # the zlib level the documents are compressed with, 0 stores them uncompressed
+
+HEADER = struct.Struct('>II')  # the length and crc32 of the compressed document that follows
+
+
+class DocArchive(object):
+    """
+    keeps the raw DocV2 of every visited app, so new columns can be derived later without crawling again.
+    the documents are appended to a log file as records of a HEADER and the zlib compressed document,
+    and an sqlite index maps every docid to the offsets of its records. a record that was only partly written
+    when the crawler stopped is cut off the log, and records missing from the index are indexed again
+    """
+
+    def __init__(self, directory, compression_level=ARCHIVE_COMPRESSION_LEVEL):
+        """
+        :param directory: the folder to keep the log and its index in
+        :param compression_level: the zlib level to compress the documents with
+        """
+
+        self.compression_level = compression_level
+        self.lock = threading.Lock()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self.db = sqlite3.connect(os.path.join(directory, 'docs.db'), check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS docs '
+                        '(offset INTEGER PRIMARY KEY, docid TEXT, version_code INTEGER)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS docs_docid ON docs (docid)')
+        self.db.commit()
+
+        self.log = open(os.path.join(directory, 'docs.log'), 'a+b')
+        self._recover()
+
+    def _recover(self):
+        """
+        index the records after the last indexed record, and cut off a partly written record at the end of the log
+        """
+
+        row = self.db.execute('SELECT MAX(offset) FROM docs').fetchone()
+        offset = 0
+        if row[0] is not None:
+            self.log.seek(row[0])
+            offset = row[0] + HEADER.size + HEADER.unpack(self.log.read(HEADER.size))[0]
+
+        self.log.seek(0, os.SEEK_END)
+        end = self.log.tell()
+        recovered = 0
+        while offset < end:
+            try:
+                details = self._read(offset)
+            except (IOError, DecodeError, zlib.error):
+                logging.warning("cutting off a partly written document at " + str(offset) + " bytes of the archive")
+                self.log.truncate(offset)
+                break
+            self.db.execute('INSERT OR REPLACE INTO docs VALUES (?, ?, ?)',
+                            (offset, details.docid, details.details.appDetails.versionCode))
+            self.log.seek(offset)
+            offset += HEADER.size + HEADER.unpack(self.log.read(HEADER.size))[0]
+            recovered += 1
+
+        if recovered:
+            logging.info("indexed " + str(recovered) + " documents that were missing from the archive index")
+        self.db.commit()
+
+    def _read(self, offset):
+        self.log.seek(offset)
+        header = self.log.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise IOError('the record at ' + str(offset) + ' is truncated')
+        length, crc = HEADER.unpack(header)
+        data = self.log.read(length)
+        if len(data) < length or zlib.crc32(data) != crc:
+            raise IOError('the record at ' + str(offset) + ' is corrupt')
+
+        details = apkfetch_pb2.DocV2()
+        details.ParseFromString(zlib.decompress(data))
+        return details
+
+    def append(self, details):
+        """
+        :param details: the DocV2 of an app
+        :return: the offset of the record of the document in the log
+        """
+
+        data = zlib.compress(details.SerializeToString(), self.compression_level)
+        with self.lock:
+            self.log.seek(0, os.SEEK_END)
+            offset = self.log.tell()
+            self.log.write(HEADER.pack(len(data), zlib.crc32(data)) + data)
+            self.db.execute('INSERT OR REPLACE INTO docs VALUES (?, ?, ?)',
+                            (offset, details.docid, details.details.appDetails.versionCode))
+        return offset
+
+    def get(self, docid):
+        """
+        :param docid: the package name of an app
+        :return: the last archived DocV2 of the app, or None if it is not archived
+        """
+
+        with self.lock:
+            row = self.db.execute('SELECT MAX(offset) FROM docs WHERE docid = ?', (docid,)).fetchone()
+            if row[0] is None:
+                return None
+            self.log.flush()
+            return self._read(row[0])
+
+    def versions(self, docid):
+        """
+        :param docid: the package name of an app
+        :return: a list of (version_code, offset) tuples of the archived documents of the app, oldest first
+        """
+
+        with self.lock:
+            return self.db.execute('SELECT version_code, offset FROM docs WHERE docid = ? ORDER BY offset',
+                                   (docid,)).fetchall()
+
+    def read(self, offset):
+        """
+        :param offset: the offset of a record, as returned by append or versions
+        :return: the DocV2 of the record
+        """
+
+        with self.lock:
+            self.log.flush()
+            return self._read(offset)
+
+    def __iter__(self):
+        """
+        :return: an iterator over all archived documents, in the order they were archived
+        """
+
+        with self.lock:
+            offsets = [row[0] for row in self.db.execute('SELECT offset FROM docs ORDER BY offset')]
+        for offset in offsets:
+            yield self.read(offset)
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+
+    def flush(self):
+        """
+        write the archived documents to disk and commit their index
+        """
+
+        with self.lock:
+            self.log.flush()
+            os.fsync(self.log.fileno())
+            self.db.commit()
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.log.close()
+            self.db.close()
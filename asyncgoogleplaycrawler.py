@@ -0,0 +1,296 @@
+from __future__ import print_function
+
+import asyncio
+import logging
+import aiohttp
+from urllib.parse import urlencode
+import apkfetch_pb2
+from util import encrypt
+from googleplaycrawler import (BULK_DETAILS_SIZE, GOOGLE_LOGIN_URL, GOOGLE_DETAILS_URL, GOOGLE_BULKDETAILS_URL,
+                               GOOGLE_DELIVERY_URL, GOOGLE_PURCHASE_URL, GOOGLE_REVIEWS_URL, GOOGLE_FDFE_URL,
+                               LOGIN_USER_AGENT, MARKET_USER_AGENT, PURCHASE_ENCODED_TARGETS)
+
+MAX_IN_FLIGHT = 200  # max amount of requests to have in flight at the same time
+
+
+class AsyncGooglePlayCrawler(object):
+    """
+    the asyncio twin of GooglePlayCrawler. it speaks the same protobuf protocol to the fdfe endpoints
+    and raises the same errors, but many requests can be in flight at the same time:
+
+        async with AsyncGooglePlayCrawler() as apk:
+            await apk.login(user, password, android_id)
+            details = await asyncio.gather(*[apk.details(p) for p in packages], return_exceptions=True)
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT):
+        self.max_in_flight = max_in_flight
+        self.session = None
+        self.semaphore = None
+        self.user = self.password = self.android_id = self.token = self.auth = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """
+        create the http session. the connection pool is as large as the amount of requests in flight
+        """
+
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.max_in_flight)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self.semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _request(self, method, url, **kwargs):
+        """
+        perform a request, waiting for a free slot when max_in_flight requests are already in flight
+        :return: the body of the response
+        """
+
+        await self.open()
+        async with self.semaphore:
+            async with self.session.request(method, url, **kwargs) as response:
+                return await response.read()
+
+    async def _fdfe(self, method, url, **kwargs):
+        """
+        perform a request to one of the fdfe endpoints
+        :return: the parsed ResponseWrapper
+        """
+
+        content = await self._request(method, url, **kwargs)
+        response = apkfetch_pb2.ResponseWrapper()
+        response.ParseFromString(content)
+        return response
+
+    def _headers(self):
+        return {'X-DFE-Device-Id': self.android_id,
+                'X-DFE-Client-Id': 'am-android-google',
+                'Accept-Encoding': '',
+                'Host': 'android.clients.google.com',
+                'Authorization': 'GoogleLogin Auth=' + self.auth,
+                'User-Agent': MARKET_USER_AGENT}
+
+    async def request_service(self, service, app, user_agent=LOGIN_USER_AGENT):
+        """
+        requesting a login service from google
+        :param service: the service to request, like ac2dm
+        :param app: the app to request to
+        :param user_agent: the user agent
+        :return: The response from the server
+        """
+
+        headers = {'User-Agent': user_agent,
+                   'Content-Type': 'application/x-www-form-urlencoded'}
+
+        if self.android_id:
+            headers['device'] = self.android_id
+
+        data = {'accountType': 'HOSTED_OR_GOOGLE',
+                'has_permission': '1',
+                'add_account': '1',
+                'get_accountid': '1',
+                'service': service,
+                'app': app,
+                'source': 'android',
+                'Email': self.user}
+
+        if self.android_id:
+            data['androidId'] = self.android_id
+
+        data['EncryptedPasswd'] = self.token or encrypt(self.user, self.password).decode('ascii')
+
+        # aiohttp would send a dict as multipart/form-data, so the form is encoded here
+        content = await self._request('POST', GOOGLE_LOGIN_URL, data=urlencode(data), headers=headers)
+        response_values = dict([line.split('=', 1) for line in content.decode('utf8').splitlines()])
+
+        if 'Error' in response_values:
+            error_msg = response_values.get('ErrorDetail', None) or response_values.get('Error')
+            if 'Url' in response_values:
+                error_msg += '\n\nTo resolve the issue, visit: ' + response_values['Url']
+                error_msg += '\n\nOr try: https://accounts.google.com/b/0/DisplayUnlockCaptcha'
+            raise Exception(error_msg)
+        elif 'Auth' not in response_values:
+            raise Exception('Could not login')
+
+        return response_values.get('Token', None), response_values.get('Auth')
+
+    async def login(self, user, password, android_id=None):
+        """
+        login using google's as2dm authentication system
+        :param user: email
+        :param password: password
+        :param android_id: android id
+        :return: True if the login was successful, False otherwise
+        """
+
+        self.user = user
+        self.password = password
+        self.android_id = android_id
+
+        self.token, self.auth = await self.request_service('ac2dm', 'com.google.android.gsf')
+
+        logging.info('token: ' + self.token)
+
+        _, self.auth = await self.request_service('androidmarket', 'com.android.vending', MARKET_USER_AGENT)
+        logging.info('auth: ' + self.auth)
+
+        return self.auth is not None
+
+    async def details(self, package_name):
+        """
+        performs a GET request to get the details of a specific app
+        :param package_name: the app to get details from
+        :return: the details of the app
+        """
+
+        details_response = await self._fdfe('GET', GOOGLE_DETAILS_URL, params={'doc': package_name},
+                                            headers=self._headers())
+        details = details_response.payload.detailsResponse.docV2
+        if not details:
+            raise Exception('Could not get details for: ' + package_name)
+        if details_response.commands.displayErrorMessage != "":
+            raise Exception(
+                'error getting details: ' + details_response.commands.displayErrorMessage + " for: " + package_name)
+        return details
+
+    async def bulk_details(self, package_names):
+        """
+        performs POST requests to the bulkDetails endpoint to get the details of many apps at once.
+        the batches of BULK_DETAILS_SIZE docids are all requested at the same time
+        :param package_names: the apps to get details from
+        :return: a dict mapping every package name to its details, or None if the server returned no details for it
+        """
+
+        headers = self._headers()
+        headers['Content-Type'] = 'application/x-protobuf'
+
+        async def request_batch(batch):
+            bulk_request = apkfetch_pb2.BulkDetailsRequest()
+            bulk_request.docid.extend(batch)
+            bulk_request.includeChildDocs = False
+
+            bulk_response = await self._fdfe('POST', GOOGLE_BULKDETAILS_URL, data=bulk_request.SerializeToString(),
+                                             headers=headers)
+            if bulk_response.commands.displayErrorMessage != "":
+                raise Exception('error getting bulk details: ' + bulk_response.commands.displayErrorMessage)
+            return bulk_response.payload.bulkDetailsResponse.entry
+
+        package_names = list(package_names)
+        batches = [package_names[start:start + BULK_DETAILS_SIZE]
+                   for start in range(0, len(package_names), BULK_DETAILS_SIZE)]
+
+        details = {}
+        for batch, entries in zip(batches, await asyncio.gather(*[request_batch(batch) for batch in batches])):
+            entries = dict((entry.doc.docid, entry.doc) for entry in entries if entry.HasField('doc'))
+            for package_name in batch:
+                details[package_name] = entries.get(package_name)
+
+        missing = [package_name for package_name in package_names if details[package_name] is None]
+        if missing:
+            logging.warning('bulk details returned no details for: ' + ", ".join(missing))
+
+        return details
+
+    async def reviews(self, package_name, amount=50):
+        """
+        performs a GET request to get the reviews of a specific app
+        :param package_name: the app to get reviews from
+        :param amount: amount of reviews to get
+        :return: a list of reviews
+        """
+
+        params = {'doc': package_name,
+                  'n': str(amount)}
+        review_response = await self._fdfe('GET', GOOGLE_REVIEWS_URL, params=params, headers=self._headers())
+
+        if not review_response:
+            raise Exception('Could not get reviews for: ' + package_name)
+        if review_response.commands.displayErrorMessage != "":
+            raise Exception(
+                'error getting reviews: ' + review_response.commands.displayErrorMessage + " for: " + package_name)
+        return review_response.payload.reviewResponse.getResponse
+
+    async def get_download_url(self, package_name, version_code):
+        """
+        performs a GET request to get the download url of a specific app
+        :param package_name: the app to get the download url from
+        :param version_code: the version of the app to download
+        :return: the download url
+        """
+
+        headers = self._headers()
+        del headers['User-Agent']
+        headers['Content-Type'] = 'application/x-www-form-urlencoded; charset=UTF-8'
+
+        data = {'doc': package_name,
+                'ot': '1',
+                'vc': str(version_code)}
+
+        delivery_response = await self._fdfe('GET', GOOGLE_DELIVERY_URL, params=data, headers=headers)
+
+        if not delivery_response:
+            raise Exception('Could not get download url for: ' + package_name)
+        if delivery_response.commands.displayErrorMessage != "":
+            raise Exception(
+                'error getting download url: ' + delivery_response.commands.displayErrorMessage + " for: " + package_name)
+        return delivery_response.payload.deliveryResponse.appDeliveryData.downloadUrl
+
+    async def purchase(self, package_name, version_code):
+        """
+        performs a POST request to get the download token of a specific app and complete the purchase
+        :param package_name: the app to get the download token from
+        :param version_code: the version of the app to get the download token from
+        :return: return the download token
+        """
+
+        if version_code is None:
+            raise Exception('no version code for purchase')
+
+        headers = self._headers()
+        headers.update({
+            "X-DFE-Encoded-Targets": PURCHASE_ENCODED_TARGETS,
+            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+            "X-DFE-MCCMNC": "310260",
+            "X-DFE-Network-Type": "4",
+            "X-DFE-Content-Filters": "",
+            "X-DFE-Request-Params": "timeoutMs=4000",
+        })
+
+        params = {'ot': '1',
+                  'doc': package_name,
+                  'vc': str(version_code)}
+
+        response = await self._fdfe('POST', GOOGLE_PURCHASE_URL, headers=headers, params=params,
+                                    timeout=aiohttp.ClientTimeout(total=60))
+        if response.commands.displayErrorMessage != "":
+            raise Exception(
+                'error performing purchase: ' + response.commands.displayErrorMessage + " for: " + package_name)
+        else:
+            download_token = response.payload.buyResponse.downloadToken
+            return download_token
+
+    async def get_related(self, browse_stream):
+        """
+        get the list of apps under the "more you might like" section under app details
+        :param browse_stream: the link from the app details to request the list of related apps
+        :return: a list of related apps and their details
+        """
+
+        related_response = await self._fdfe('GET', GOOGLE_FDFE_URL + "/" + browse_stream, headers=self._headers())
+
+        if not related_response:
+            raise Exception('Could not get related apps for')
+        if related_response.commands.displayErrorMessage != "":
+            raise Exception('error getting related apps: ' + related_response.commands.displayErrorMessage)
+        return related_response.preFetch[0].response.payload.listResponse.doc[0]
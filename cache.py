@@ -0,0 +1,261 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode
+
+
+class PageCache(object):
+    """
+    stores web pages on disk together with their ETag, so they can be revalidated
+    with a conditional request instead of downloaded again
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf8')).hexdigest())
+
+    def get(self, url):
+        """
+        :param url: the url of the page
+        :return: a (etag, content) tuple, or (None, None) if the page is not cached
+        """
+
+        path = self._path(url)
+        try:
+            with open(path + '.etag', 'r', encoding='utf8') as etag_file:
+                etag = etag_file.read()
+            with open(path + '.html', 'rb') as page_file:
+                content = page_file.read()
+        except (IOError, OSError):
+            return None, None
+        return etag, content
+
+    def put(self, url, etag, content):
+        """
+        :param url: the url of the page
+        :param etag: the ETag the server returned for the page
+        :param content: the content of the page
+        """
+
+        path = self._path(url)
+        # the page is only used when its etag exists, so remove the etag until the new page is written
+        if os.path.exists(path + '.etag'):
+            os.remove(path + '.etag')
+        with open(path + '.html.tmp', 'wb') as page_file:
+            page_file.write(content)
+        os.replace(path + '.html.tmp', path + '.html')
+        with open(path + '.etag', 'w', encoding='utf8') as etag_file:
+            etag_file.write(etag)
+
+
+class ResponseCache(object):
+    """
+    stores raw ResponseWrapper responses on disk. the responses are stored once per distinct content,
+    named after their sha256, and an sqlite index maps request keys to them.
+    an entry is fresh until its soft ttl, can be used as a fallback until its ttl, and the least
+    recently used entries are evicted once the responses take up more than max_size bytes.
+    the access times of cache hits are kept in memory and written to the index by the next put, touch or close,
+    so reading a response does not commit the index
+    """
+
+    def __init__(self, directory, ttl=24 * 3600, max_size=1024 ** 3):
+        """
+        :param directory: the folder to store the responses in
+        :param ttl: the default amount of seconds a response stays fresh
+        :param max_size: the max amount of bytes of the stored responses
+        """
+
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.accessed = {}  # the access times of the cache hits that are not written to the index yet
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self.db = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, blob TEXT, size INTEGER, '
+                        'soft_expires REAL, expires REAL, etag TEXT, accessed REAL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)')
+        self.db.commit()
+        self.size = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM '
+                                    '(SELECT DISTINCT blob, size FROM entries)').fetchone()[0]
+
+    @staticmethod
+    def key(url, params=None):
+        """
+        :param url: the url of the request, relative to the fdfe endpoint or absolute
+        :param params: the query parameters of the request
+        :return: the key of the request: the path relative to the fdfe endpoint with sorted query parameters,
+                 the same format as the url of a PreFetch
+        """
+
+        path, _, query = url.partition('/fdfe/')[2].partition('?') if '/fdfe/' in url else url.partition('?')
+        query = parse_qsl(query) + [(k, str(v)) for k, v in (params or {}).items()]
+        return path + ('?' + urlencode(sorted(query)) if query else '')
+
+    def _path(self, blob):
+        return os.path.join(self.directory, blob[:2], blob)
+
+    def get(self, key):
+        """
+        :param key: the key of the request
+        :return: a (content, fresh, etag) tuple. fresh is False if the soft ttl passed,
+                 (None, False, None) if the response is not cached or its ttl passed
+        """
+
+        now = time.time()
+        with self.lock:
+            row = self.db.execute('SELECT blob, soft_expires, expires, etag FROM entries WHERE key = ?',
+                                  (key,)).fetchone()
+            if row is None or row[2] < now:
+                return None, False, None
+            self.accessed[key] = now
+
+        try:
+            with open(self._path(row[0]), 'rb') as blob_file:
+                return blob_file.read(), row[1] >= now, row[3]
+        except (IOError, OSError):
+            return None, False, None
+
+    def put(self, key, content, ttl=None, soft_ttl=None, etag=None):
+        """
+        :param key: the key of the request
+        :param content: the raw response
+        :param ttl: the amount of seconds the response can be used, self.ttl by default
+        :param soft_ttl: the amount of seconds the response is fresh, ttl by default
+        :param etag: the ETag of the response
+        """
+
+        ttl = self.ttl if ttl is None else ttl
+        soft_ttl = ttl if soft_ttl is None else min(soft_ttl, ttl)
+        blob = hashlib.sha256(content).hexdigest()
+        path = self._path(blob)
+        now = time.time()
+
+        with self.lock:
+            if not os.path.exists(path):
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+                with open(path + '.tmp', 'wb') as blob_file:
+                    blob_file.write(content)
+                os.replace(path + '.tmp', path)
+                self.size += len(content)
+
+            self._write_accessed()
+            old = self.db.execute('SELECT blob FROM entries WHERE key = ?', (key,)).fetchone()
+            self.db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                            (key, blob, len(content), now + soft_ttl, now + ttl, etag, now))
+            if old is not None and old[0] != blob:
+                self._remove_unused(old[0])
+            self._evict()
+            self.db.commit()
+
+    def touch(self, key, ttl=None):
+        """
+        make a stored response fresh again, after the server confirmed it did not change
+        :param key: the key of the request
+        :param ttl: the amount of seconds the response can be used, self.ttl by default
+        """
+
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self.lock:
+            self._write_accessed()
+            self.db.execute('UPDATE entries SET soft_expires = ?, expires = ?, accessed = ? WHERE key = ?',
+                            (now + ttl, now + ttl, now, key))
+            self.db.commit()
+
+    def _write_accessed(self):
+        """
+        write the access times of the cache hits to the index, in the transaction of the caller
+        """
+
+        if self.accessed:
+            self.db.executemany('UPDATE entries SET accessed = ? WHERE key = ?',
+                                [(accessed, key) for key, accessed in self.accessed.items()])
+            self.accessed = {}
+
+    def _remove_unused(self, blob):
+        if self.db.execute('SELECT COUNT(*) FROM entries WHERE blob = ?', (blob,)).fetchone()[0] == 0:
+            path = self._path(blob)
+            if os.path.exists(path):
+                self.size -= os.path.getsize(path)
+                os.remove(path)
+
+    def _evict(self):
+        """
+        remove expired entries, then the least recently used entries until the responses fit in max_size
+        """
+
+        for key, blob in self.db.execute('SELECT key, blob FROM entries WHERE expires < ?', (time.time(),)).fetchall():
+            self.db.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._remove_unused(blob)
+
+        while self.size > self.max_size:
+            rows = self.db.execute('SELECT key, blob FROM entries ORDER BY accessed LIMIT 100').fetchall()
+            if not rows:
+                break
+            for key, blob in rows:
+                self.db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._remove_unused(blob)
+                if self.size <= self.max_size:
+                    break
+
+    def close(self):
+        with self.lock:
+            self._write_accessed()
+            self.db.commit()
+            self.db.close()
+
+
+class DetailsStore(object):
+    """
+    keeps the details of apps the server already sent along with other responses,
+    until they are used or until max_size newer details pushed them out
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.details = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, package_name):
+        with self.lock:
+            return package_name in self.details
+
+    def __len__(self):
+        with self.lock:
+            return len(self.details)
+
+    def put(self, package_name, details):
+        with self.lock:
+            self.details.pop(package_name, None)
+            self.details[package_name] = details
+            while len(self.details) > self.max_size:
+                self.details.popitem(last=False)
+
+    def get(self, package_name):
+        """
+        :return: the details of the app without removing them, or None if they are not stored
+        """
+
+        with self.lock:
+            return self.details.get(package_name)
+
+    def pop(self, package_name):
+        """
+        :return: the details of the app, or None if they are not stored
+        """
+
+        with self.lock:
+            return self.details.pop(package_name, None)
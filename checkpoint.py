@@ -0,0 +1,131 @@
+import time
+import sqlite3
+
+CHECKPOINT_INTERVAL = 5  # seconds between two commits of the checkpoint
+
+
+class Checkpoint(object):
+    """
+    stores the state of a crawl in an sqlite database, so an interrupted crawl can be resumed.
+    the frontier, the apps that are being visited, the visited set and the iteration counter are
+    updated incrementally as the crawl goes, and committed at most every CHECKPOINT_INTERVAL seconds
+    """
+
+    def __init__(self, path, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.last_commit = time.time()
+        self.before_commit = []
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        # apps that are scheduled, in the order they were scheduled. inflight is 1 once they are being visited
+        self.db.execute('CREATE TABLE IF NOT EXISTS frontier '
+                        '(seq INTEGER PRIMARY KEY AUTOINCREMENT, package TEXT, priority INTEGER, inflight INTEGER)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS visited (package TEXT PRIMARY KEY)')
+        self.db.commit()
+
+    def start(self, order, max_iterations, iteration):
+        """
+        forget the previous crawl and start checkpointing a new one
+        :param order: the order of the frontier
+        :param max_iterations: the (max) amount of apps to crawl through
+        :param iteration: the iteration counter at the start of the crawl
+        """
+
+        self.db.execute('DELETE FROM meta')
+        self.db.execute('DELETE FROM frontier')
+        self.db.execute('DELETE FROM visited')
+        self.db.executemany('INSERT INTO meta VALUES (?, ?)', [('order', order),
+                                                              ('max_iterations', str(max_iterations)),
+                                                              ('iteration', str(iteration)),
+                                                              ('finished', '0')])
+        self.db.commit()
+
+    def scheduled(self, apps):
+        """
+        :param apps: a list of (package_name, priority) tuples that were added to the frontier and visited set
+        """
+
+        self.db.executemany('INSERT INTO frontier (package, priority, inflight) VALUES (?, ?, 0)', apps)
+        self.db.executemany('INSERT OR IGNORE INTO visited VALUES (?)', [(app[0],) for app in apps])
+
+    def popped(self, package_names):
+        """
+        :param package_names: the apps that were taken from the frontier to be visited
+        """
+
+        self.db.executemany('UPDATE frontier SET inflight = 1 WHERE seq = '
+                            '(SELECT MIN(seq) FROM frontier WHERE package = ? AND inflight = 0)',
+                            [(package_name,) for package_name in package_names])
+
+    def finished(self, package_name):
+        """
+        :param package_name: an app that was visited
+        """
+
+        self.db.execute('DELETE FROM frontier WHERE seq = '
+                        '(SELECT MIN(seq) FROM frontier WHERE package = ? AND inflight = 1)', (package_name,))
+
+    def commit(self, iteration, finished=False):
+        """
+        commit all changes since the last commit. the functions in before_commit are called first,
+        so the output of the visited apps is stored before they are removed from the checkpoint
+        :param iteration: the current iteration counter
+        :param finished: whether the crawl is done
+        """
+
+        for function in self.before_commit:
+            function()
+
+        self.db.execute('UPDATE meta SET value = ? WHERE key = ?', (str(iteration), 'iteration'))
+        self.db.execute('UPDATE meta SET value = ? WHERE key = ?', ('1' if finished else '0', 'finished'))
+        self.db.commit()
+        self.last_commit = time.time()
+
+    def maybe_commit(self, iteration):
+        """
+        commit if the last commit was more than interval seconds ago
+        :param iteration: the current iteration counter
+        """
+
+        if time.time() - self.last_commit >= self.interval:
+            self.commit(iteration)
+
+    def load(self):
+        """
+        load the state of the last checkpointed crawl
+        :return: a dict with the order, max_iterations, iteration and finished values of the crawl and
+                 the frontier as a list of (package_name, priority) tuples, in the order they were scheduled.
+                 apps that were being visited are part of the frontier again and not counted in iteration
+        """
+
+        meta = dict(self.db.execute('SELECT key, value FROM meta'))
+        if not meta:
+            raise Exception('there is no crawl to resume in ' + self.path)
+
+        frontier = self.db.execute('SELECT package, priority FROM frontier ORDER BY seq').fetchall()
+        inflight = self.db.execute('SELECT COUNT(*) FROM frontier WHERE inflight = 1').fetchone()[0]
+        iteration = int(meta['iteration']) - inflight
+        # the iteration is stored along, or loading again before the next commit would subtract the apps again
+        self.db.execute('UPDATE frontier SET inflight = 0')
+        self.db.execute('UPDATE meta SET value = ? WHERE key = ?', (str(iteration), 'iteration'))
+        self.db.commit()
+
+        max_iterations = meta['max_iterations']
+        return {'order': meta['order'],
+                'max_iterations': None if max_iterations == 'None' else int(max_iterations),
+                'iteration': iteration,
+                'finished': meta['finished'] == '1',
+                'frontier': frontier}
+
+    def visited(self):
+        """
+        :return: an iterator over all apps that were added to the visited set during the crawl
+        """
+
+        return (row[0] for row in self.db.execute('SELECT package FROM visited'))
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,427 @@
+import os
+import gzip
+import zlib
+import base64
+import hashlib
+import logging
+import threading
+import requests
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from ratelimit import BandwidthLimiter
+
+DOWNLOAD_WORKERS = 2  # amount of apps to download at the same time
+DOWNLOAD_QUEUE_SIZE = 100  # max amount of apps waiting to be downloaded, the crawl waits when the queue is full
+DOWNLOAD_ATTEMPTS = 3  # amount of crawls that try to download an app before it is given up on
+DOWNLOAD_THREADS = 8  # amount of files to download at the same time, like the splits of an app
+DOWNLOAD_HOST_CONNECTIONS = 4  # max amount of connections to a single download host
+DOWNLOAD_BANDWIDTH = None  # max bytes per second to download, None for no limit
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # bytes to read from the network and write to disk at once
+DOWNLOAD_RETRIES = 3  # amount of times an interrupted download is resumed
+DOWNLOAD_TIMEOUT = 60  # seconds to wait for the server before a download counts as interrupted
+
+GDIFF = 1  # the patchFormat of a gdiff patch
+GZIPPED_GDIFF = 2  # the patchFormat of a gzipped gdiff patch
+PATCH_FORMATS = (GDIFF, GZIPPED_GDIFF)  # the patch formats the downloader can apply
+
+GDIFF_HEADER = b'\xd1\xff\xd1\xff\x04'  # the magic number and version 4
+GDIFF_COPY = {249: (2, 1), 250: (2, 2), 251: (2, 4), 252: (4, 1),
+              253: (4, 2), 254: (4, 4), 255: (8, 4)}  # the (offset, length) sizes of the copy commands
+
+
+def digest_matches(expected, digest):
+    """
+    the delivery data contains digests as urlsafe base64 without padding, but older responses use hex
+    :param expected: the digest from the delivery data
+    :param digest: the raw digest of the downloaded file
+    :return: True if the digests are the same
+    """
+
+    encoded = base64.urlsafe_b64encode(digest).decode('ascii')
+    return expected in (digest.hex(), encoded, encoded.rstrip('='), base64.b64encode(digest).decode('ascii'),
+                        base64.b64encode(digest).decode('ascii').rstrip('='))
+
+
+def file_digests(path, block_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    :param path: a file on disk
+    :param block_size: bytes to read at once
+    :return: a dict with the size and the hex sha1 and sha256 of the file, like Downloader.download returns
+    """
+
+    hashes = {'sha1': hashlib.sha1(), 'sha256': hashlib.sha256()}
+    size = 0
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(block_size), b''):
+            size += len(block)
+            for digest in hashes.values():
+                digest.update(block)
+    return {'size': size, 'sha1': hashes['sha1'].hexdigest(), 'sha256': hashes['sha256'].hexdigest()}
+
+
+def apply_gdiff(source, patch, write, block_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    apply a gdiff patch, see https://www.w3.org/TR/NOTE-gdiff-19970901
+    :param source: a seekable file object of the file the patch is based on
+    :param patch: a file object of the patch
+    :param write: a function that is called with every piece of the patched file, in order
+    :param block_size: max bytes to read at once
+    """
+
+    def read(length):
+        data = patch.read(length)
+        if len(data) < length:
+            raise IOError('the patch is truncated')
+        return data
+
+    def number(length):
+        return int.from_bytes(read(length), 'big')
+
+    def copy(file, read_from, length):
+        while length > 0:
+            block = read_from(min(length, block_size))
+            if not block:
+                raise IOError('the patch reads past the end of the ' + file)
+            write(block)
+            length -= len(block)
+
+    if patch.read(len(GDIFF_HEADER)) != GDIFF_HEADER:
+        raise IOError('the patch is not a gdiff file')
+
+    while True:
+        command = number(1)
+        if command == 0:
+            return
+        elif command <= 246:
+            write(read(command))
+        elif command in (247, 248):
+            copy('patch', read, number(2 if command == 247 else 4))
+        else:
+            offset_size, length_size = GDIFF_COPY[command]
+            source.seek(number(offset_size))
+            copy('base file', source.read, number(length_size))
+
+
+class Downloader(object):
+    """
+    downloads files to a .part file next to their destination and renames them once they are complete.
+    an interrupted download is resumed from the .part file using an http Range request,
+    also when the crawler is restarted. the file is hashed while it is written, and a file with
+    the wrong size or digest is downloaded again.
+    when the server offers a smaller gzipped version of the file, that one is downloaded and decompressed
+    while it is written. an interrupted gzipped download is resumed from the uncompressed url.
+    a newer version of a file can also be made from the stored version and a patch.
+    the files of an app are downloaded in parallel by a pool of threads that share one connection pool,
+    with at most host_connections connections to every host. all downloads together share the bandwidth limit
+    """
+
+    def __init__(self, session=None, user_agent=None, chunk_size=DOWNLOAD_CHUNK_SIZE, retries=DOWNLOAD_RETRIES,
+                 threads=DOWNLOAD_THREADS, bandwidth=DOWNLOAD_BANDWIDTH, host_connections=DOWNLOAD_HOST_CONNECTIONS):
+        if session is None:
+            session = requests.Session()
+            # a blocking pool makes a download wait for a free connection instead of opening another one
+            adapter = HTTPAdapter(pool_connections=threads, pool_maxsize=host_connections, pool_block=True)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        self.user_agent = user_agent
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+        self.bandwidth = BandwidthLimiter(bandwidth)
+
+    def close(self):
+        self.pool.shutdown()
+
+    def download_all(self, files):
+        """
+        download a set of files in parallel
+        :param files: a list of dicts with the arguments of download for every file
+        :return: a list with the result of download for every file
+        """
+
+        futures = [self.pool.submit(self.download, **file) for file in files]
+        return [future.result() for future in futures]
+
+    def download(self, url, path, size=None, sha1=None, sha256=None, gzip_url=None, gzip_size=None):
+        """
+        download a file
+        :param url: the url to download from
+        :param path: the file to download to
+        :param size: the expected size of the file in bytes, if known
+        :param sha1: the expected sha1 digest of the file, if known
+        :param sha256: the expected sha256 digest of the file, if known
+        :param gzip_url: the url to download the gzipped file from, if there is one
+        :param gzip_size: the size of the gzipped file in bytes
+        :return: a dict with the size and the hex sha1 and sha256 of the file if the download was successful,
+                 None otherwise
+        """
+
+        if not gzip_url or not gzip_size or (size and gzip_size >= size):
+            gzip_url = None
+
+        for attempt in range(self.retries + 1):
+            try:
+                return self._download(url, path, size, sha1, sha256, gzip_url)
+            except (requests.RequestException, IOError) as e:
+                logging.error('error: ' + str(e) + ".\n Download of " + path + " was interrupted. attempt " +
+                              str(attempt + 1) + " out of " + str(self.retries + 1))
+
+        return None
+
+    def patch(self, base_path, url, path, patch_format, size=None, sha1=None, sha256=None):
+        """
+        download a patch and apply it to a stored file
+        :param base_path: the file the patch is based on
+        :param url: the url to download the patch from
+        :param path: the file to write the patched file to, this can be base_path
+        :param patch_format: the format of the patch, one of PATCH_FORMATS
+        :param size: the expected size of the patched file in bytes, if known
+        :param sha1: the expected sha1 digest of the patched file, if known
+        :param sha256: the expected sha256 digest of the patched file, if known
+        :return: the same as download
+        """
+
+        if patch_format not in PATCH_FORMATS:
+            logging.info("the patch format {} of {} is not supported".format(patch_format, path))
+            return None
+
+        patch_path = path + '.patch'
+        part = path + '.part'
+        try:
+            if not self.download(url, patch_path):
+                return None
+
+            hashes = {'sha1': hashlib.sha1(), 'sha256': hashlib.sha256()}
+            written = [0]
+            open_patch = gzip.open if patch_format == GZIPPED_GDIFF else open
+            with open(base_path, 'rb') as source, open_patch(patch_path, 'rb') as patch, \
+                    open(part, 'wb', buffering=self.chunk_size) as fp:
+                def write(chunk):
+                    written[0] += self._write(fp, chunk, hashes)
+                apply_gdiff(source, patch, write, self.chunk_size)
+
+            return self._finish(part, path, written[0], size, {'sha1': sha1, 'sha256': sha256}, hashes)
+        except (IOError, EOFError, zlib.error) as e:
+            logging.error('error: ' + str(e) + ".\n Patching " + base_path + " failed")
+            # a partly patched file can not be resumed by a normal download
+            if os.path.exists(part):
+                os.remove(part)
+            return None
+        finally:
+            if os.path.exists(patch_path):
+                os.remove(patch_path)
+
+    def _download(self, url, path, size, sha1, sha256, gzip_url=None):
+        part = path + '.part'
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if size and offset > size:
+            os.remove(part)
+            offset = 0
+
+        hashes = {'sha1': hashlib.sha1(), 'sha256': hashlib.sha256()}
+
+        # ask for the raw bytes, a compressed transfer would make the Range offsets meaningless
+        headers = {'Accept-Encoding': 'identity'}
+        if self.user_agent:
+            headers['User-Agent'] = self.user_agent
+        if offset:
+            headers['Range'] = 'bytes={}-'.format(offset)
+            gzip_url = None
+        elif gzip_url:
+            logging.info("downloading the gzipped version of " + path)
+
+        response = self.session.get(gzip_url or url, headers=headers, stream=True, allow_redirects=True,
+                                    timeout=DOWNLOAD_TIMEOUT)
+        try:
+            if offset and response.status_code == 416:
+                # the .part file already holds the whole file
+                mode = None
+            else:
+                response.raise_for_status()
+                mode = 'ab' if offset and response.status_code == 206 else 'wb'
+
+            if mode == 'wb':
+                offset = 0
+            else:
+                logging.info("resuming download of " + path + " at " + str(offset) + " bytes")
+            if offset:
+                # a resumed download only reads back the part that was downloaded before
+                with open(part, 'rb') as fp:
+                    for block in iter(lambda: fp.read(self.chunk_size), b''):
+                        for digest in hashes.values():
+                            digest.update(block)
+
+            written = offset
+            if mode is not None:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip_url else None
+                host = urlparse(response.url).netloc
+                self.bandwidth.open()
+                try:
+                    # the file object buffers chunk_size bytes, so every chunk is a single write without flushing
+                    with open(part, mode, buffering=self.chunk_size) as fp:
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            self.bandwidth.consume(len(chunk), host)
+                            if decompressor is not None:
+                                chunk = decompressor.decompress(chunk)
+                            written += self._write(fp, chunk, hashes)
+
+                        if decompressor is not None:
+                            written += self._write(fp, decompressor.flush(), hashes)
+                            if not decompressor.eof:
+                                raise IOError('the gzipped download is truncated at {} bytes'.format(written))
+                finally:
+                    self.bandwidth.close()
+        except zlib.error as e:
+            os.remove(part)
+            raise IOError('the gzipped download is corrupt: ' + str(e))
+        finally:
+            response.close()
+
+        if size and written < size:
+            # keep the .part file, the next attempt resumes it
+            raise IOError('the download is truncated at {} of {} bytes'.format(written, size))
+
+        return self._finish(part, path, written, size, {'sha1': sha1, 'sha256': sha256}, hashes)
+
+    @staticmethod
+    def _finish(part, path, written, size, expected, hashes):
+        """
+        check the size and digests of a written .part file and move it to its destination.
+        a .part file with the wrong size or digests is removed
+        :return: a dict with the size and the hex sha1 and sha256 of the file
+        """
+
+        corrupt = [name for name, digest in hashes.items()
+                   if expected[name] and not digest_matches(expected[name], digest.digest())]
+        if (size and written != size) or corrupt:
+            os.remove(part)
+            raise IOError('the download is corrupt: ' + (", ".join(corrupt) + " mismatch" if corrupt else
+                                                         '{} bytes instead of {}'.format(written, size)))
+
+        os.replace(part, path)
+        return {'size': written, 'sha1': hashes['sha1'].hexdigest(), 'sha256': hashes['sha256'].hexdigest()}
+
+    @staticmethod
+    def _write(fp, chunk, hashes):
+        """
+        :return: the amount of bytes written
+        """
+
+        fp.write(chunk)
+        for digest in hashes.values():
+            digest.update(chunk)
+        return len(chunk)
+
+
+class DownloadQueue(object):
+    """
+    downloads apps on its own pool of workers, so the crawl does not wait for the downloads.
+    at most queue_size apps wait to be downloaded, put() blocks the crawl until there is room in the queue.
+    the jobs are kept in the apk index until they are downloaded, so the jobs of an interrupted crawl and
+    the jobs that failed are queued again by the next crawl, until they failed max_attempts times
+    """
+
+    def __init__(self, download, workers=DOWNLOAD_WORKERS, apk_index=None, queue_size=DOWNLOAD_QUEUE_SIZE,
+                 max_attempts=DOWNLOAD_ATTEMPTS):
+        """
+        :param download: the function that downloads an app, called with the package name and version code.
+                         it returns True if the app was downloaded
+        :param workers: the amount of apps to download at the same time
+        :param apk_index: the ApkIndex to keep the jobs in
+        :param queue_size: the max amount of apps waiting to be downloaded, including the ones being downloaded
+        :param max_attempts: the amount of crawls that try to download an app
+        """
+
+        self.download = download
+        self.apk_index = apk_index
+        self.max_attempts = max_attempts
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.Semaphore(queue_size)
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.closed = False
+        self.downloaded = self.failed = 0
+
+    def __len__(self):
+        with self.lock:
+            return len(self.pending)
+
+    def put(self, package_name, version_code):
+        """
+        queue an app to be downloaded, waiting until there is room in the queue
+        :param package_name: the app to download
+        :param version_code: the version of the app to download
+        :return: False if the app was already waiting to be downloaded or the queue is closed
+        """
+
+        with self.lock:
+            if package_name in self.pending or self.closed:
+                return False
+            self.pending.add(package_name)
+
+        if self.apk_index is not None:
+            self.apk_index.enqueue(package_name, version_code)
+        self.slots.acquire()
+        with self.lock:
+            if self.closed:
+                # the job stays in the apk index for the next crawl
+                self.pending.discard(package_name)
+                self.slots.release()
+                return False
+            self.pool.submit(self._run, package_name, version_code)
+        return True
+
+    def resume(self):
+        """
+        queue the apps that were not downloaded by the last crawls in the background, so the crawl can start
+        while they wait for room in the queue
+        :return: the amount of apps to queue
+        """
+
+        queued = self.apk_index.queued(self.max_attempts) if self.apk_index is not None else []
+        if queued:
+            thread = threading.Thread(target=self._resume, args=(queued,), name='download-resume')
+            thread.daemon = True
+            thread.start()
+        return len(queued)
+
+    def _resume(self, queued):
+        for package_name, version_code in queued:
+            if self.closed:
+                return
+            self.put(package_name, version_code)
+
+    def _run(self, package_name, version_code):
+        try:
+            downloaded = self.download(package_name, version_code)
+        except Exception as e:
+            logging.error('error: ' + str(e) + ". could not download " + package_name)
+            downloaded = False
+
+        if self.apk_index is not None:
+            if downloaded:
+                self.apk_index.dequeue(package_name)
+            else:
+                self.apk_index.failed(package_name)
+        with self.lock:
+            self.pending.discard(package_name)
+            if downloaded:
+                self.downloaded += 1
+            else:
+                self.failed += 1
+        self.slots.release()
+
+    def close(self):
+        """
+        stop taking new apps and wait until the queued apps are downloaded
+        """
+
+        with self.lock:
+            self.closed = True
+        self.pool.shutdown()
+
+    def stats(self):
+        with self.lock:
+            return "{} apps downloaded, {} failed, {} waiting".format(self.downloaded, self.failed, len(self.pending))
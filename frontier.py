@@ -0,0 +1,101 @@
+import heapq
+import itertools
+import logging
+from collections import deque
+
+BFS = 'bfs'  # visit the apps in the order they were discovered
+DFS = 'dfs'  # visit the most recently discovered apps first
+PRIORITY = 'priority'  # visit the apps with the highest priority first
+ORDERS = (BFS, DFS, PRIORITY)
+
+
+class Frontier(object):
+    """
+    the apps that are scheduled to be crawled through, in the order they should be visited.
+    only the package names are kept in memory and the amount of queued packages is capped by max_size
+    """
+
+    def __init__(self, order=DFS, max_size=100000):
+        if order not in ORDERS:
+            raise ValueError('unknown frontier order: ' + str(order) + '. pick one of: ' + ", ".join(ORDERS))
+
+        self.order = order
+        self.max_size = max_size
+        self.dropped = 0
+        self.counter = itertools.count()
+        self.queue = [] if order == PRIORITY else deque()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __bool__(self):
+        return len(self.queue) > 0
+
+    __nonzero__ = __bool__
+
+    def push(self, package_name, priority=0):
+        """
+        schedule an app to be visited
+        :param package_name: the app to schedule
+        :param priority: the priority of the app, only used when the order is PRIORITY. higher goes first
+        :return: True if the app was scheduled, False if the frontier is full
+        """
+
+        if self.max_size and len(self.queue) >= self.max_size:
+            self.dropped += 1
+            if self.dropped == 1:
+                logging.warning("the frontier is full (" + str(self.max_size) + " apps). newly discovered apps "
+                                "are not scheduled until there is room again")
+            return False
+
+        if self.order == PRIORITY:
+            heapq.heappush(self.queue, (-priority, next(self.counter), package_name))
+        else:
+            self.queue.append(package_name)
+        return True
+
+    def extend(self, apps):
+        """
+        schedule a list of apps, so that with every order the first app in the list is visited first
+        out of apps with the same priority
+        :param apps: a list of (package_name, priority) tuples in the order they were discovered
+        :return: a list of the package names that were scheduled
+        """
+
+        apps = list(apps)
+        overflow = []
+        if self.max_size:
+            room = max(self.max_size - len(self.queue), 0)
+            apps, overflow = apps[:room], apps[room:]
+
+        if self.order == DFS:
+            apps.reverse()
+
+        scheduled = [package_name for package_name, priority in apps + overflow if self.push(package_name, priority)]
+
+        if self.order == DFS:
+            scheduled.reverse()
+        return scheduled
+
+    def pop(self):
+        """
+        :return: the next app to visit
+        """
+
+        if self.order == PRIORITY:
+            return heapq.heappop(self.queue)[2]
+        elif self.order == DFS:
+            return self.queue.pop()
+        return self.queue.popleft()
+
+    def peek(self, amount=1):
+        """
+        :param amount: the max amount of apps to return
+        :return: a list of the next apps to visit, in the order they would be popped, without removing them
+        """
+
+        if self.order == PRIORITY:
+            return [package_name for _, _, package_name in heapq.nsmallest(amount, self.queue)]
+        elif self.order == DFS:
+            return [self.queue[-1 - i] for i in range(min(amount, len(self.queue)))]
+        return list(itertools.islice(self.queue, amount))
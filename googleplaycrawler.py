@@ -8,16 +8,57 @@ from datetime import datetime
 import requests
 import csv
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import apkfetch_pb2
+from google.protobuf.message import DecodeError
 from util import encrypt
+from frontier import Frontier, ORDERS, BFS, DFS
+from output import create_writer, FORMATS as OUTPUT_FORMATS, CSV
+from permissions import PermissionTemplate, COLUMNS, PACKED
+from schema import (APPINFO, PERMISSIONS, PERMISSION_BITS, EXTERNAL_PERMISSIONS, IMAGES,
+                    REVIEWS as REVIEWS_TABLE)
+from downloader import (Downloader, DownloadQueue, PATCH_FORMATS, DOWNLOAD_WORKERS, DOWNLOAD_BANDWIDTH,
+                        digest_matches, file_digests)
+from apkindex import ApkIndex
+from archive import DocArchive
+from checkpoint import Checkpoint
+from cache import PageCache, ResponseCache, DetailsStore
+from ratelimit import (RateLimiter, parse_rates, ENDPOINTS, DETAILS, DELIVERY, RELATED, WEB, MAX_RETRIES,
+                       REVIEWS as REVIEWS_ENDPOINT)
+from visited import create_visited_set, MemoryVisitedSet, KINDS as VISITED_KINDS, MEMORY
 from lxml import html
 
 # tweak these values according to your needs #
 DOWNLOAD_APPS = True  # should the crawler download the apk files?
+PATCH_DOWNLOADS = True  # should the crawler download a patch when it has an older version of an apk?
 STORE_INFO = True  # should the crawler store the information in the .csv files?
+OUTPUT_FORMAT = CSV  # the format to store the information in: CSV, 'parquet' (needs pyarrow) or 'sqlite'
+OUTPUT_PATH = 'apps' + os.sep + 'data'  # the folder the information is stored in
+ARCHIVE_DOCS = False  # should the crawler keep the raw details of every app it visits?
+ARCHIVE_PATH = 'apps' + os.sep + 'data' + os.sep + 'archive'  # the folder the raw details are kept in
+PERMISSIONS_FORMAT = COLUMNS  # how to store permissions: COLUMNS (0/1 columns) or PACKED (a hex bitset)
 NO_DUPLICATE_DATA = True  # whether the app should check if the starting app is crawled through or not using the .csv files
 REVIEWS = 50  # amount of reviews to get per app
-WAIT = 1  # seconds to wait before crawling the next app
+BULK_DETAILS_SIZE = 20  # max amount of packages to request details for in a single bulkDetails request
+FRONTIER_ORDER = DFS  # the order to crawl through related apps in: BFS, DFS or 'priority' (most rated apps first)
+FRONTIER_SIZE = 100000  # max amount of apps waiting to be crawled through
+WORKERS = 1  # amount of apps to crawl through at the same time
+REQUEST_TIMEOUT = 60  # seconds to wait for a response before the request is retried
+CHECKPOINT_PATH = 'apps' + os.sep + 'data' + os.sep + 'checkpoint.db'  # the file the state of the crawl is stored in
+WEB_CACHE = False  # should the crawler keep the pages of the website on disk and revalidate them using their ETag?
+WEB_CACHE_PATH = 'apps' + os.sep + 'data' + os.sep + 'webcache'  # the folder the pages of the website are kept in
+RESPONSE_CACHE = False  # should the crawler keep the details, reviews and related apps responses on disk?
+RESPONSE_CACHE_PATH = 'apps' + os.sep + 'data' + os.sep + 'responsecache'  # the folder the responses are kept in
+RESPONSE_CACHE_TTL = 24 * 3600  # seconds a cached response is used before it is requested again
+RESPONSE_CACHE_SIZE = 1024 ** 3  # max bytes of cached responses, the least recently used ones are removed first
+LIGHT_CRAWL = False  # should the crawler use the details from the related apps lists? only with STORE_INFO = False
+DETAILS_STORE_SIZE = 10000  # max amount of app details sent along with other responses to keep until they are used
+RATES = {DETAILS: 2, REVIEWS_ENDPOINT: 1, DELIVERY: 1, RELATED: 1, WEB: 2}  # max requests per second for every endpoint
+VISITED_SET = MEMORY  # how to keep track of visited apps: MEMORY, 'index' (on-disk hash table) or 'bloom'
+VISITED_INDEX_PATH = 'apps' + os.sep + 'data' + os.sep + 'visited.idx'  # the file the index visited set is stored in
+BLOOM_CAPACITY = 10000000  # the amount of apps the bloom visited set is sized for
+BLOOM_ERROR_RATE = 0.001  # the chance the bloom visited set wrongly reports an app as visited
+APK_INDEX_PATH = 'apps' + os.sep + 'data' + os.sep + 'apkindex.db'  # the file the versions of the apks are stored in
 
 DOWNLOAD_FOLDER_PATH = 'apps' + os.sep
 
@@ -37,6 +78,8 @@ MARKET_USER_AGENT = 'Android-Finsky/5.7.10 (api=3,versionCode=80371000,sdk=24,de
 CHECKIN_USER_AGENT = 'Android-Checkin/2.0 (gts3llte)'
 DOWNLOAD_USER_AGENT = 'AndroidDownloadManager/9 (Linux; U; Android 9; XT1032 Build/KXB21.14-L1.40)'
 
+PURCHASE_ENCODED_TARGETS = 'CAEScFfqlIEG6gUYogFWrAISK1WDAg+hAZoCDgIU1gYEOIACFkLMAeQBnASLATlASUuyAyqCAjY5igOMBQzfA/IClwFbApUC4ANbtgKVAS7OAX8YswHFBhgDwAOPAmGEBt4OfKkB5weSB5AFASkiN68akgMaxAMSAQEBA9kBO7UBFE1KVwIDBGs3go6BBgEBAgMECQgJAQIEAQMEAQMBBQEBBAUEFQYCBgUEAwMBDwIBAgOrARwBEwMEAg0mrwESfTEcAQEKG4EBMxghChMBDwYGASI3hAEODEwXCVh/EREZA4sBYwEdFAgIIwkQcGQRDzQ2fTC2AjfVAQIBAYoBGRg2FhYFBwEqNzACJShzFFblAo0CFxpFNBzaAd0DHjIRI4sBJZcBPdwBCQGhAUd2A7kBLBVPngEECHl0UEUMtQETigHMAgUFCc0BBUUlTywdHDgBiAJ+vgKhAU0uAcYCAWQ/5ALUAw1UwQHUBpIBCdQDhgL4AY4CBQICjARbGFBGWzA1CAEMOQH+BRAOCAZywAIDyQZ2MgM3BxsoAgUEBwcHFia3AgcGTBwHBYwBAlcBggFxSGgIrAEEBw4QEqUCASsWadsHCgUCBQMD7QICA3tXCUw7ugJZAwGyAUwpIwM5AwkDBQMJA5sBCw8BNxBVVBwVKhebARkBAwsQEAgEAhESAgQJEBCZATMdzgEBBwG8AQQYKSMUkAEDAwY/CTs4/wEaAUt1AwEDAQUBAgIEAwYEDx1dB2wGeBFgTQ'
+
 
 def num_to_hex(num):
     hex_str = format(num, 'x')
@@ -44,12 +87,64 @@ def num_to_hex(num):
     return hex_str.zfill(length + length % 2)
 
 
+def missing_fields(details):
+    """
+    check whether app details that did not come from the details endpoint, like the apps in a list,
+    contain the fields the crawler needs to visit the app
+    :param details: the details of an app
+    :return: a list of the missing fields, empty if the details can be used
+    """
+
+    missing = []
+    if not details.relatedLinks.youMightAlsoLike.url2:
+        missing += ['relatedLinks.youMightAlsoLike.url2']
+    if not details.offer:
+        missing += ['offer']
+    if DOWNLOAD_APPS and not details.details.appDetails.versionCode:
+        missing += ['details.appDetails.versionCode']
+    return missing
+
+
 class GooglePlayCrawler(object):
 
-    def __init__(self):
+    def __init__(self, rates=None, page_cache=None, response_cache=None, light=LIGHT_CRAWL, apk_index=None,
+                 download_workers=DOWNLOAD_WORKERS, bandwidth=DOWNLOAD_BANDWIDTH, writer=None, archive=None):
         self.session = requests.Session()
+        self.web_session = requests.Session()
+        self.page_cache = page_cache
+        self.response_cache = response_cache
+        self.details_store = DetailsStore(DETAILS_STORE_SIZE)
+        if light and (STORE_INFO or archive is not None):
+            # the related apps lists leave out the description and permissions, so every app would be requested
+            logging.warning("a light crawl needs the full details when the information is stored or archived. "
+                            "crawling without --light")
+            light = False
+        self.light = light
+        self.light_store = DetailsStore(DETAILS_STORE_SIZE)
+        self.limiter = RateLimiter(RATES if rates is None else rates)
         self.user = self.password = self.android_id = self.token = self.auth = None
         self.iter = 0
+        self.writer = writer or create_writer(CSV, OUTPUT_PATH)
+        self.permission_template = None
+        self.archive = archive
+        self.downloader = Downloader(user_agent=DOWNLOAD_USER_AGENT, bandwidth=bandwidth)
+        self.apk_index = apk_index
+        self.downloads = DownloadQueue(self.download_app, download_workers, apk_index)
+
+    def close(self):
+        """
+        wait for the queued downloads and write all stored information that is still waiting to be written
+        """
+
+        self.downloads.close()
+        self.downloader.close()
+        self.writer.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.apk_index is not None:
+            self.apk_index.close()
+        if self.archive is not None:
+            self.archive.close()
 
     def request_service(self, service, app, user_agent=LOGIN_USER_AGENT):
         """
@@ -116,13 +211,110 @@ class GooglePlayCrawler(object):
 
         return self.auth is not None
 
+    def request(self, endpoint, method, url, parse=True, session=None, cache=False, **kwargs):
+        """
+        performs a request after waiting for the rate limiter. when the server is busy or the request fails,
+        the endpoint backs off and the request is retried up to MAX_RETRIES times for its failure class
+        :param endpoint: the rate limiter endpoint the request belongs to
+        :param method: the http method
+        :param url: the url to request
+        :param parse: whether to parse the response as a protobuf ResponseWrapper
+        :param session: the session to perform the request with, self.session by default
+        :param cache: whether the response can be served from and stored in the response cache
+        :param kwargs: extra arguments for the request, like params, data and headers
+        :return: the parsed ResponseWrapper, or the response if parse is False
+        """
+
+        session = session or self.session
+        kwargs.setdefault('allow_redirects', True)
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        attempt = 0
+
+        cache_key = stale = None
+        if cache and parse and self.response_cache is not None:
+            cache_key = self.response_cache.key(url, kwargs.get('params'))
+            content, fresh, etag = self.response_cache.get(cache_key)
+            if fresh:
+                return apkfetch_pb2.ResponseWrapper.FromString(content)
+
+            # a stale response is revalidated using its etag, and used when the server can not be reached
+            stale = content
+            if stale is not None and etag:
+                kwargs['headers'] = dict(kwargs.get('headers') or {}, **{'If-None-Match': etag})
+
+        while True:
+            self.limiter.acquire(endpoint)
+            status_code = None
+            error = None
+            error_message = ""
+
+            try:
+                response = session.request(method, url, **kwargs)
+                status_code = response.status_code
+                if parse:
+                    content = response.content
+                    if status_code == 304 and stale is not None:
+                        content = stale
+                        self.response_cache.touch(cache_key)
+                    elif cache_key is not None and status_code == 200:
+                        etag = response.headers.get('ETag')
+
+                    response = apkfetch_pb2.ResponseWrapper.FromString(content)
+                    error_message = response.commands.displayErrorMessage
+            except (requests.RequestException, DecodeError) as e:
+                error = e
+                error_message = str(e)
+
+            failure = self.limiter.report(endpoint, status_code, error_message)
+            if failure is None or attempt >= MAX_RETRIES[failure]:
+                if failure is not None and stale is not None:
+                    logging.warning('error: ' + error_message + ". using the stale cached response for " + url)
+                    return apkfetch_pb2.ResponseWrapper.FromString(stale)
+                if error is not None:
+                    raise error
+                if cache_key is not None and status_code == 200 and not error_message:
+                    self.response_cache.put(cache_key, content, etag=etag)
+                if parse and status_code != 304:
+                    self.harvest_prefetch(response)
+                return response
+
+            attempt += 1
+            logging.warning('error: ' + error_message + ". " + endpoint + " request failed (" + failure +
+                            "), backing off and retrying. attempt " + str(attempt + 1) + " out of " +
+                            str(MAX_RETRIES[failure] + 1))
+
+    def harvest_prefetch(self, response):
+        """
+        the server sends the responses to requests it expects us to make next along with a response.
+        these are stored in the response cache, and the details of apps in them in the details store,
+        so requesting them later does not need another round trip
+        :param response: a ResponseWrapper
+        """
+
+        for prefetch in response.preFetch:
+            if self.response_cache is not None and prefetch.url:
+                # the ttls of a PreFetch are in milliseconds
+                ttl = prefetch.ttl / 1000.0 if prefetch.ttl else None
+                soft_ttl = prefetch.softTtl / 1000.0 if prefetch.softTtl else None
+                self.response_cache.put(self.response_cache.key(prefetch.url),
+                                        prefetch.response.SerializeToString(), ttl, soft_ttl, prefetch.etag or None)
+
+            details = prefetch.response.payload.detailsResponse.docV2
+            if details.docid:
+                self.details_store.put(details.docid, details)
+
     def details(self, package_name):
         """
-        performs a GET request to get the details of a specific app
+        performs a GET request to get the details of a specific app,
+        unless the server already sent them along with an earlier response
         :param package_name: the app to get details from
         :return: the details of the app
         """
 
+        details = self.details_store.pop(package_name)
+        if details is not None:
+            return details
+
         headers = {'X-DFE-Device-Id': self.android_id,
                    'X-DFE-Client-Id': 'am-android-google',
                    'Accept-Encoding': '',
@@ -131,10 +323,8 @@ class GooglePlayCrawler(object):
                    'User-Agent': MARKET_USER_AGENT}
 
         params = {'doc': package_name}
-        response = self.session.get(GOOGLE_DETAILS_URL, params=params, headers=headers, allow_redirects=True)
-
-        details_response = apkfetch_pb2.ResponseWrapper()
-        details_response.ParseFromString(response.content)
+        details_response = self.request(DETAILS, 'GET', GOOGLE_DETAILS_URL, params=params, headers=headers,
+                                        cache=True)
         details = details_response.payload.detailsResponse.docV2
         if not details:
             raise Exception('Could not get details for: ' + package_name)
@@ -143,6 +333,50 @@ class GooglePlayCrawler(object):
                 'error getting details: ' + details_response.commands.displayErrorMessage + " for: " + package_name)
         return details
 
+    def bulk_details(self, package_names):
+        """
+        performs POST requests to the bulkDetails endpoint to get the details of many apps at once.
+        the packages are sent in batches of BULK_DETAILS_SIZE docids per request
+        :param package_names: the apps to get details from
+        :return: a dict mapping every package name to its details, or None if the server returned no details for it
+        """
+
+        headers = {'X-DFE-Device-Id': self.android_id,
+                   'X-DFE-Client-Id': 'am-android-google',
+                   'Accept-Encoding': '',
+                   'Host': 'android.clients.google.com',
+                   'Authorization': 'GoogleLogin Auth=' + self.auth,
+                   'User-Agent': MARKET_USER_AGENT,
+                   'Content-Type': 'application/x-protobuf'}
+
+        details = {}
+        package_names = list(package_names)
+
+        for start in range(0, len(package_names), BULK_DETAILS_SIZE):
+            batch = package_names[start:start + BULK_DETAILS_SIZE]
+
+            bulk_request = apkfetch_pb2.BulkDetailsRequest()
+            bulk_request.docid.extend(batch)
+            bulk_request.includeChildDocs = False
+
+            bulk_response = self.request(DETAILS, 'POST', GOOGLE_BULKDETAILS_URL,
+                                         data=bulk_request.SerializeToString(), headers=headers)
+            if bulk_response.commands.displayErrorMessage != "":
+                raise Exception('error getting bulk details: ' + bulk_response.commands.displayErrorMessage)
+
+            # packages the server could not find get an empty entry or none at all, so the entries are matched
+            # on their docid instead of their position
+            entries = dict((entry.doc.docid, entry.doc) for entry in bulk_response.payload.bulkDetailsResponse.entry
+                           if entry.HasField('doc'))
+            for package_name in batch:
+                details[package_name] = entries.get(package_name)
+
+        missing = [package_name for package_name in package_names if details[package_name] is None]
+        if missing:
+            logging.warning('bulk details returned no details for: ' + ", ".join(missing))
+
+        return details
+
     def reviews(self, package_name, amount=50):
         """
         performs a GET request to get the reviews of a specific app
@@ -160,10 +394,8 @@ class GooglePlayCrawler(object):
 
         params = {'doc': package_name,
                   'n': amount}
-        response = self.session.get(GOOGLE_REVIEWS_URL, params=params, headers=headers, allow_redirects=True)
-
-        review_response = apkfetch_pb2.ResponseWrapper()
-        review_response.ParseFromString(response.content)
+        review_response = self.request(REVIEWS_ENDPOINT, 'GET', GOOGLE_REVIEWS_URL, params=params,
+                                       headers=headers, cache=True)
 
         if not review_response:
             raise Exception('Could not get reviews for: ' + package_name)
@@ -180,6 +412,17 @@ class GooglePlayCrawler(object):
         :return: the download url
         """
 
+        return self.get_delivery_data(package_name, version_code).downloadUrl
+
+    def get_delivery_data(self, package_name, version_code, base_version_code=None):
+        """
+        performs a GET request to get the delivery data of a specific app
+        :param package_name: the app to get the delivery data from
+        :param version_code: the version of the app to download
+        :param base_version_code: the version of the app that is stored, to get a patch from that version
+        :return: the AndroidAppDeliveryData with the download url, size and digests of the app
+        """
+
         headers = {'X-DFE-Device-Id': self.android_id,
                    'X-DFE-Client-Id': 'am-android-google',
                    'Accept-Encoding': '',
@@ -190,19 +433,19 @@ class GooglePlayCrawler(object):
         data = {'doc': package_name,
                 'ot': '1',
                 'vc': version_code}
+        if base_version_code:
+            data['bvc'] = base_version_code
+            data['pf'] = list(PATCH_FORMATS)
 
-        response = self.session.get(GOOGLE_DELIVERY_URL, params=data, verify=True, headers=headers,
-                                    allow_redirects=True)
-
-        delivery_response = apkfetch_pb2.ResponseWrapper()
-        delivery_response.ParseFromString(response.content)
+        delivery_response = self.request(DELIVERY, 'GET', GOOGLE_DELIVERY_URL, params=data, verify=True,
+                                         headers=headers)
 
         if not delivery_response:
             raise Exception('Could not get download url for: ' + package_name)
         if delivery_response.commands.displayErrorMessage != "":
             raise Exception(
                 'error getting download url: ' + delivery_response.commands.displayErrorMessage + " for: " + package_name)
-        return delivery_response.payload.deliveryResponse.appDeliveryData.downloadUrl
+        return delivery_response.payload.deliveryResponse.appDeliveryData
 
     def purchase(self, package_name, version_code):
         """
@@ -216,7 +459,7 @@ class GooglePlayCrawler(object):
             raise Exception('no version code for purchase')
 
         headers = {
-            "X-DFE-Encoded-Targets": "CAEScFfqlIEG6gUYogFWrAISK1WDAg+hAZoCDgIU1gYEOIACFkLMAeQBnASLATlASUuyAyqCAjY5igOMBQzfA/IClwFbApUC4ANbtgKVAS7OAX8YswHFBhgDwAOPAmGEBt4OfKkB5weSB5AFASkiN68akgMaxAMSAQEBA9kBO7UBFE1KVwIDBGs3go6BBgEBAgMECQgJAQIEAQMEAQMBBQEBBAUEFQYCBgUEAwMBDwIBAgOrARwBEwMEAg0mrwESfTEcAQEKG4EBMxghChMBDwYGASI3hAEODEwXCVh/EREZA4sBYwEdFAgIIwkQcGQRDzQ2fTC2AjfVAQIBAYoBGRg2FhYFBwEqNzACJShzFFblAo0CFxpFNBzaAd0DHjIRI4sBJZcBPdwBCQGhAUd2A7kBLBVPngEECHl0UEUMtQETigHMAgUFCc0BBUUlTywdHDgBiAJ+vgKhAU0uAcYCAWQ/5ALUAw1UwQHUBpIBCdQDhgL4AY4CBQICjARbGFBGWzA1CAEMOQH+BRAOCAZywAIDyQZ2MgM3BxsoAgUEBwcHFia3AgcGTBwHBYwBAlcBggFxSGgIrAEEBw4QEqUCASsWadsHCgUCBQMD7QICA3tXCUw7ugJZAwGyAUwpIwM5AwkDBQMJA5sBCw8BNxBVVBwVKhebARkBAwsQEAgEAhESAgQJEBCZATMdzgEBBwG8AQQYKSMUkAEDAwY/CTs4/wEaAUt1AwEDAQUBAgIEAwYEDx1dB2wGeBFgTQ",
+            "X-DFE-Encoded-Targets": PURCHASE_ENCODED_TARGETS,
             "User-Agent": MARKET_USER_AGENT,
             'X-DFE-Device-Id': self.android_id,
             "X-DFE-Client-Id": "am-android-google",
@@ -234,11 +477,8 @@ class GooglePlayCrawler(object):
                   'doc': package_name,
                   'vc': version_code}
 
-        response = requests.post(GOOGLE_PURCHASE_URL, headers=headers,
-                                 params=params, verify=True,
-                                 timeout=60)
-
-        response = apkfetch_pb2.ResponseWrapper.FromString(response.content)
+        response = self.request(DELIVERY, 'POST', GOOGLE_PURCHASE_URL, session=requests, headers=headers,
+                                params=params, verify=True, timeout=60)
         if response.commands.displayErrorMessage != "":
             raise Exception(
                 'error performing purchase: ' + response.commands.displayErrorMessage + " for: " + package_name)
@@ -248,33 +488,162 @@ class GooglePlayCrawler(object):
 
     def fetch(self, package_name, version_code, apk_fn=None):
         """
-        download the app, by getting a download url.
+        download the app, by getting a download url. the splits and additional files (obb) of the app
+        are downloaded in parallel, and every file is checked against its size and digests from the delivery data.
+        when an older version of the apk is stored, only a patch is downloaded if the server offers one.
+        an unverified apk from the apk index that has the digest of the delivery data is kept instead of downloaded
         :param package_name: the app to download
         :param version_code: the version of the app to download
         :param apk_fn: predefined name, package_name by default
         :return: True if the download was successful, False otherwise.
         """
 
-        url = self.get_download_url(package_name, version_code)
-        if not url:
+        apk_fn = apk_fn or (DOWNLOAD_FOLDER_PATH + package_name + '.apk')
+        base = self.patch_base(package_name, version_code, apk_fn)
+        delivery_data = self.get_delivery_data(package_name, version_code, base and base['version_code'])
+        if not delivery_data.downloadUrl:
             return 0
 
-        response = self.session.get(url, headers={'User-Agent': DOWNLOAD_USER_AGENT},
-                                    stream=True, allow_redirects=True)
-
         logging.info("downloading...")
+        patched = None
+        stored = self.apk_index.get(package_name) if self.apk_index is not None else None
+        patch_data = delivery_data.patchData
+        if stored is not None and not stored['verified'] and delivery_data.sha1 and os.path.exists(apk_fn) \
+                and os.path.getsize(apk_fn) == stored['size'] \
+                and digest_matches(delivery_data.sha1, bytes.fromhex(stored['sha1'])):
+            logging.info("the stored apk of {} is version {} already".format(package_name, version_code))
+            patched = stored
+        elif base and delivery_data.HasField('patchData') and patch_data.baseVersionCode == base['version_code'] \
+                and digest_matches(patch_data.baseSha1, bytes.fromhex(base['sha1'])):
+            logging.info("downloading a patch from version {} to {} of {}".format(
+                base['version_code'], version_code, package_name))
+            patched = self.downloader.patch(apk_fn, patch_data.downloadUrl, apk_fn, patch_data.patchFormat,
+                                            delivery_data.downloadSize, delivery_data.sha1, delivery_data.sha256)
+            if not patched:
+                logging.warning("patching " + package_name + " failed. downloading the whole apk")
+
+        files = []
+        if not patched:
+            files.append({'url': delivery_data.downloadUrl,
+                          'path': apk_fn,
+                          'size': delivery_data.downloadSize,
+                          'sha1': delivery_data.sha1,
+                          'sha256': delivery_data.sha256,
+                          'gzip_url': delivery_data.downloadUrlGzipped,
+                          'gzip_size': delivery_data.downloadSizeGzipped})
+
+        for split in delivery_data.split:
+            files.append({'url': split.downloadUrl,
+                          'path': os.path.splitext(apk_fn)[0] + '.' + split.name + '.apk',
+                          'size': split.size,
+                          'sha1': split.sha1,
+                          'sha256': split.sha256,
+                          'gzip_url': split.downloadUrlGzipped,
+                          'gzip_size': split.sizeGzipped})
+
+        for additional_file in delivery_data.additionalFile:
+            # named like android names them: main.<versionCode>.<package>.obb or patch.<versionCode>.<package>.obb
+            obb_type = 'patch' if additional_file.fileType == 1 else 'main'
+            files.append({'url': additional_file.downloadUrl,
+                          'path': os.path.join(os.path.dirname(apk_fn), '{}.{}.{}.obb'.format(
+                              obb_type, additional_file.versionCode or version_code, package_name)),
+                          'size': additional_file.size,
+                          'sha1': additional_file.sha1,
+                          'gzip_url': additional_file.downloadUrlGzipped,
+                          'gzip_size': additional_file.sizeGzipped})
+
+        if len(files) > 1:
+            logging.info("downloading {} files for {}".format(len(files), package_name))
+        results = self.downloader.download_all(files)
+        if not all(results):
+            return False
+
+        apk = patched or results[0]
+        other_files = [(file['path'], result['size']) for file, result in zip(files, results)
+                       if file['path'] != apk_fn]
+        if self.apk_index is not None:
+            self.apk_index.put(package_name, version_code, apk['size'], apk['sha1'], apk['sha256'], other_files)
+        return True
+
+    def download_app(self, package_name, version_code):
+        """
+        purchase and download an app. this runs on the workers of the download queue
+        :param package_name: the app to download
+        :param version_code: the version of the app to download
+        :return: True if the download was successful, False otherwise.
+        """
+
+        if self.purchase(package_name, version_code):
+            logging.info("successful purchase")
+        if self.fetch(package_name, version_code):
+            logging.info('Downloaded version {} of {}'.format(version_code, package_name))
+            return True
+        return False
+
+    def is_downloaded(self, package_name, version_code, apk_fn=None):
+        """
+        check the apk index for the version of the app, so unchanged apps are not purchased and downloaded again
+        :param package_name: the app to download
+        :param version_code: the version of the app to download
+        :param apk_fn: the file the apk is stored in, package_name by default
+        :return: True if this version of the app is stored, its version was verified and its apk, splits and obb files
+                 have the size in the index
+        """
+
+        if self.apk_index is None:
+            return False
+
         apk_fn = apk_fn or (DOWNLOAD_FOLDER_PATH + package_name + '.apk')
-        if os.path.exists(apk_fn):
-            os.remove(apk_fn)
+        stored = self.apk_index.get(package_name)
+        if stored is None or not stored['verified'] or stored['version_code'] != version_code:
+            return False
+        return all(os.path.exists(path) and os.path.getsize(path) == size
+                   for path, size in [(apk_fn, stored['size'])] + stored['files'])
+
+    def seed_apk_index(self):
+        """
+        add the apks that were downloaded before the apk index was kept to the index as unverified apks.
+        their version is a guess: the last crawled version of the app in the output, which is not the version
+        on disk if its download failed. so they are still purchased, and the apk is kept if it has the digest
+        of the delivery data, or used as the base of a patch, which checks its digest as well
+        :return: the amount of apks that were added to the index
+        """
+
+        if self.apk_index is None or not os.path.isdir(DOWNLOAD_FOLDER_PATH):
+            return 0
+
+        unindexed = set(name[:-len('.apk')] for name in os.listdir(DOWNLOAD_FOLDER_PATH) if name.endswith('.apk'))
+        unindexed = set(package_name for package_name in unindexed if self.apk_index.get(package_name) is None)
+        if not unindexed:
+            return 0
 
-        with open(apk_fn, 'wb') as fp:
-            for chunk in response.iter_content(chunk_size=5 * 1024):
-                if chunk:
-                    fp.write(chunk)
-                    fp.flush()
-            fp.close()
+        versions = {}
+        for package_name, version_code in self.writer.versions():
+            if package_name in unindexed and version_code:
+                versions[package_name] = max(int(version_code), versions.get(package_name, 0))
 
-        return os.path.exists(apk_fn)
+        for package_name, version_code in versions.items():
+            apk = file_digests(DOWNLOAD_FOLDER_PATH + package_name + '.apk')
+            self.apk_index.put(package_name, version_code, apk['size'], apk['sha1'], apk['sha256'], verified=False)
+        return len(versions)
+
+    def patch_base(self, package_name, version_code, apk_fn):
+        """
+        :param package_name: the app to download
+        :param version_code: the version of the app to download
+        :param apk_fn: the file the apk is stored in
+        :return: the apk index entry of the stored older version of the app to patch, or None if there is none
+        """
+
+        if not PATCH_DOWNLOADS or self.apk_index is None:
+            return None
+
+        stored = self.apk_index.get(package_name)
+        if stored is None or stored['version_code'] >= version_code:
+            return None
+        if not os.path.exists(apk_fn) or os.path.getsize(apk_fn) != stored['size']:
+            return None
+        return stored
 
     def get_related(self, browse_stream):
         """
@@ -290,17 +659,45 @@ class GooglePlayCrawler(object):
                    'Authorization': 'GoogleLogin Auth=' + self.auth,
                    'User-Agent': MARKET_USER_AGENT}
 
-        response = self.session.get(GOOGLE_FDFE_URL + "/" + browse_stream, params=None, headers=headers,
-                                    allow_redirects=True)
-
-        related_response = apkfetch_pb2.ResponseWrapper()
-        related_response.ParseFromString(response.content)
+        related_response = self.request(RELATED, 'GET', GOOGLE_FDFE_URL + "/" + browse_stream, headers=headers,
+                                        cache=True)
 
         if not related_response:
             raise Exception('Could not get related apps for')
         if related_response.commands.displayErrorMessage != "":
             raise Exception('error getting related apps: ' + related_response.commands.displayErrorMessage)
-        return related_response.preFetch[0].response.payload.listResponse.doc[0]
+
+        # the list is sent as the first PreFetch, unless the response is that PreFetch taken from the response cache
+        if related_response.preFetch:
+            return related_response.preFetch[0].response.payload.listResponse.doc[0]
+        return related_response.payload.listResponse.doc[0]
+
+    def get_web_info(self, url):
+        """
+        since the requests to the server do not return category and android version information,
+        this function gets the information from the website. the page is downloaded and parsed only once
+        for all fields, and revalidated using its ETag when the page cache is turned on
+        :param url: the apps url of the website version of the google play store
+        :return: a dict with the list of categories and the minimum required android version string
+        """
+
+        headers = {}
+        etag = content = None
+        if self.page_cache is not None:
+            etag, content = self.page_cache.get(url)
+            if etag:
+                headers['If-None-Match'] = etag
+
+        page = self.request(WEB, 'GET', url, parse=False, session=self.web_session, headers=headers)
+
+        if page.status_code != 304 or content is None:
+            content = page.content
+            if self.page_cache is not None and page.status_code == 200 and page.headers.get('ETag'):
+                self.page_cache.put(url, page.headers['ETag'], content)
+
+        tree = html.fromstring(content)
+        return {'category': tree.xpath('//a[@itemprop="genre"]/text()'),
+                'android_version': tree.xpath('//span[@class="htlgb"]/text()')[4]}
 
     def get_category(self, url):
         """
@@ -310,10 +707,7 @@ class GooglePlayCrawler(object):
         :return: a list of categories
         """
 
-        page = requests.get(url)
-        tree = html.fromstring(page.content)
-        category = tree.xpath('//a[@itemprop="genre"]/text()')
-        return category
+        return self.get_web_info(url)['category']
 
     def get_android_version(self, url):
         """
@@ -323,29 +717,19 @@ class GooglePlayCrawler(object):
         :return: the minimum required android version string
         """
 
-        page = requests.get(url)
-        tree = html.fromstring(page.content)
-        version = tree.xpath('//span[@class="htlgb"]/text()')
-        return version[4]
+        return self.get_web_info(url)['android_version']
 
-    def load_visited_apps(self):
+    def load_visited_apps(self, visited_apps=None):
         """
-        load all apps previously visited from the appinfo.csv file
-        :return: a list of previously crawled apps
+        load all apps previously visited from the stored app info in a single pass
+        :param visited_apps: the visited set to add the apps to, a new MemoryVisitedSet by default
+        :return: a visited set of previously crawled apps
         """
 
-        with open("apps" + os.sep + "data" + os.sep + "appinfo.csv", "r", encoding="utf8") as csvfile:
-            file = csv.reader(csvfile, delimiter=',', quotechar='"')
-            visited_apps = []
-
-            for row in file:
-                if row:
-                    visited_apps += [row[0]]
+        if visited_apps is None:
+            visited_apps = MemoryVisitedSet()
 
-            csvfile.close()
-
-        # pop the column names
-        visited_apps.pop(0)
+        visited_apps.update(self.writer.packages())
 
         logging.info(
             str(len(visited_apps)) + " previously crawled apps loaded. This crawler won't crawl through these apps.")
@@ -369,121 +753,113 @@ class GooglePlayCrawler(object):
 
     def store(self, details, reviews, related_apps):
         """
-        store the details and reviews of an app into a .csv file
+        store the details and reviews of an app using the output writer.
+        the rows are only handed to the writer once all of them are built,
+        so an app that fails halfway never ends up partially stored
         :param details: the list of details of a specific app
         :param reviews: the list of reviews from a specific app
         :param related_apps: a list of related apps
         """
 
-        with open("apps" + os.sep + "data" + os.sep + "appinfo.csv", "a", encoding="utf8") as csv_file:
-            related_apps_string = ""
-            for app in related_apps:
-                related_apps_string += app.docid + ","
-            related_apps_string = related_apps_string[:-1]
-
-            url = "https://play.google.com/store/apps/details?id=" + details.docid + "&hl=en"
-
-            category_string = ""
-            for category in self.get_category(url):
-                category_string += category + ","
-            category_string = category_string[:-1]
-
-            android_version = self.get_android_version(url)
-
-            file = csv.writer(csv_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            file.writerow([details.docid, details.backendDocid, details.title, details.descriptionHtml,
-                           details.descriptionShort,
-                           url, "https://android.clients.google.com/fdfe/" + details.relatedLinks.youMightAlsoLike.url2,
-                           related_apps_string, category_string, details.details.appDetails.appType,
-                           details.offer[0].micros, details.offer[0].currencyCode,
-                           details.details.appDetails.numDownloads, details.relatedLinks.rated.label,
-                           details.aggregateRating.starRating, details.aggregateRating.ratingsCount,
-                           details.aggregateRating.fiveStarRatings,
-                           details.aggregateRating.fourStarRatings, details.aggregateRating.threeStarRatings,
-                           details.aggregateRating.twoStarRatings, details.aggregateRating.oneStarRatings,
-                           details.details.appDetails.developerAddress,
-                           details.details.appDetails.developerEmail, details.details.appDetails.developerWebsite,
-                           details.details.appDetails.developerName, details.creator,
-                           details.relatedLinks.privacyPolicyUrl,
-                           details.details.appDetails.versionCode, details.details.appDetails.versionString,
-                           details.details.appDetails.uploadDate,
-                           details.details.appDetails.recentChangesHtml, android_version,
-                           details.details.appDetails.installationSize, details.details.appDetails.unstable,
-                           details.details.appDetails.hasInstantLink, details.details.appDetails.containsAds])
-            csv_file.close()
-
-        with open("apps" + os.sep + "data" + os.sep + "permissions.csv", "a", encoding="utf8") as csv_file:
-            with open("templatePermissions.csv", "r", encoding="utf8") as permissionsFile:
-                permissions = csv.reader(permissionsFile, delimiter=',', quotechar='"')
-                file = csv.writer(csv_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-                has_permission = [details.docid]
-                for row in permissions:
-                    if row[0] in details.details.appDetails.permission:
-                        has_permission += [1]
-                    else:
-                        has_permission += [0]
-
-                file.writerow(has_permission)
-                permissionsFile.close()
-            csv_file.close()
-
-        with open("apps" + os.sep + "data" + os.sep + "externalpermissions.csv", "a", encoding="utf8") as csv_file:
-            file = csv.writer(csv_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            external_permissions = ""
-            for row in details.details.appDetails.permission:
-                if not row.startswith("android.permission."):
-                    external_permissions += row + ", "
-
-            if external_permissions:
-                external_permissions = external_permissions[:-2]
-
-            file.writerow([details.docid, external_permissions])
-            csv_file.close()
-
-        with open("apps" + os.sep + "data" + os.sep + "images.csv", "a", encoding="utf8") as csv_file:
-            file = csv.writer(csv_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            image_urls = ""
-            for image in details.image:
-                image_urls += image.imageUrl + ", "
-
-            if image_urls:
-                image_urls = image_urls[:-2]
-
-            file.writerow([details.docid, image_urls])
-            csv_file.close()
-
-        with open("apps" + os.sep + "data" + os.sep + "reviews.csv", "a", encoding="utf8") as csv_file:
-            file = csv.writer(csv_file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-
-            for data in reviews.review:
-                file.writerow([details.docid, data.documentVersion, data.timestampMsec, data.starRating, data.comment,
-                               data.userProfile.personId, data.userProfile.name, data.userProfile.image[0].imageUrl])
-
-            csv_file.close()
-
-    def visit_app(self, package_name):
-        """
-        gets and stores the information and reviews of a specific package and downloads the apkfile
+        related_apps_string = ""
+        for app in related_apps:
+            related_apps_string += app.docid + ","
+        related_apps_string = related_apps_string[:-1]
+
+        url = "https://play.google.com/store/apps/details?id=" + details.docid + "&hl=en"
+
+        web_info = self.get_web_info(url)
+
+        category_string = ""
+        for category in web_info['category']:
+            category_string += category + ","
+        category_string = category_string[:-1]
+
+        android_version = web_info['android_version']
+
+        app_info = [details.docid, details.backendDocid, details.title, details.descriptionHtml,
+                    details.descriptionShort,
+                    url, "https://android.clients.google.com/fdfe/" + details.relatedLinks.youMightAlsoLike.url2,
+                    related_apps_string, category_string, details.details.appDetails.appType,
+                    details.offer[0].micros, details.offer[0].currencyCode,
+                    details.details.appDetails.numDownloads, details.relatedLinks.rated.label,
+                    details.aggregateRating.starRating, details.aggregateRating.ratingsCount,
+                    details.aggregateRating.fiveStarRatings,
+                    details.aggregateRating.fourStarRatings, details.aggregateRating.threeStarRatings,
+                    details.aggregateRating.twoStarRatings, details.aggregateRating.oneStarRatings,
+                    details.details.appDetails.developerAddress,
+                    details.details.appDetails.developerEmail, details.details.appDetails.developerWebsite,
+                    details.details.appDetails.developerName, details.creator,
+                    details.relatedLinks.privacyPolicyUrl,
+                    details.details.appDetails.versionCode, details.details.appDetails.versionString,
+                    details.details.appDetails.uploadDate,
+                    details.details.appDetails.recentChangesHtml, android_version,
+                    details.details.appDetails.installationSize, details.details.appDetails.unstable,
+                    details.details.appDetails.hasInstantLink, details.details.appDetails.containsAds]
+
+        if self.permission_template is None:
+            self.permission_template = PermissionTemplate.load()
+        permission_bits = self.permission_template.bitset(details.details.appDetails.permission)
+
+        external_permissions = ""
+        for row in details.details.appDetails.permission:
+            if not row.startswith("android.permission."):
+                external_permissions += row + ", "
+
+        if external_permissions:
+            external_permissions = external_permissions[:-2]
+
+        image_urls = ""
+        for image in details.image:
+            image_urls += image.imageUrl + ", "
+
+        if image_urls:
+            image_urls = image_urls[:-2]
+
+        review_rows = []
+        for data in reviews.review:
+            review_rows += [[details.docid, data.documentVersion, data.timestampMsec, data.starRating, data.comment,
+                             data.userProfile.personId, data.userProfile.name, data.userProfile.image[0].imageUrl]]
+
+        # the sqlite output keys the tables about the app on its version and the reviews on their id
+        version = [details.details.appDetails.versionCode]
+        self.writer.write(APPINFO, [app_info])
+        if PERMISSIONS_FORMAT == PACKED:
+            self.writer.write(PERMISSION_BITS, [[details.docid, self.permission_template.pack(permission_bits)]],
+                              version)
+        else:
+            self.writer.write(PERMISSIONS, [[details.docid] + self.permission_template.row(permission_bits)], version)
+        self.writer.write(EXTERNAL_PERMISSIONS, [[details.docid, external_permissions]], version)
+        self.writer.write(IMAGES, [[details.docid, image_urls]], version)
+        self.writer.write(REVIEWS_TABLE, review_rows, [data.commentId for data in reviews.review])
+
+    def visit_app(self, package_name, details=None):
+        """
+        gets and stores the information and reviews of a specific package and queues the apkfile to be downloaded
         :param package_name: the package to start from
+        :param details: the details of the app if they were already fetched using bulk_details
         :return: a list of related apps to visit next
         """
 
         logging.info("started crawling through " + package_name + " on iteration: {}".format(self.iter))
         print("started crawling through " + package_name + " on iteration: {}".format(self.iter))
-        details = self.details(package_name)
+        if details is None:
+            details = self.light_details(package_name)
+        if details is None or missing_fields(details):
+            details = self.details(package_name)
         version = details.details.appDetails.versionCode
+        if self.archive is not None:
+            self.archive.append(details)
         reviews = self.reviews(package_name, REVIEWS)
 
         if not DOWNLOAD_APPS:
             logging.info("downloading is turned off")
-            time.sleep(5)
         elif details.offer[0].micros > 0:
             logging.warning("This app needs to be paid for in order to download")
+        elif self.is_downloaded(package_name, version):
+            logging.info("version {} of {} is already downloaded".format(version, package_name))
         else:
-            if self.purchase(package_name, version):
-                logging.info("successful purchase")
-            if self.fetch(package_name, version):
-                logging.info('Downloaded version {}'.format(version))
+            self.downloads.put(package_name, version)
 
         related_apps = self.get_related(details.relatedLinks.youMightAlsoLike.url2)
 
@@ -492,65 +868,237 @@ class GooglePlayCrawler(object):
 
         return related_apps.child
 
-    def crawl(self, package_name, visited_packages=None, max_iterations=1):
+    def light_details(self, package_name):
+        """
+        in a light crawl, the details of an app are taken from the list of related apps it was found in.
+        these contain the title, offer, rating and images, but not everything the details endpoint returns
+        :param package_name: the app to get details from
+        :return: the details of the app from the related apps list, or None if they are missing required fields
+        """
+
+        details = self.light_store.pop(package_name)
+        if details is None:
+            return None
+
+        missing = missing_fields(details)
+        if missing:
+            logging.info("the related apps list is missing " + ", ".join(missing) + " for " + package_name +
+                         ". requesting the full details")
+            return None
+        return details
+
+    def has_light_details(self, package_name):
+        """
+        :return: True if the light crawl store has details of the app without missing fields
+        """
+
+        details = self.light_store.get(package_name)
+        return details is not None and not missing_fields(details)
+
+    def prefetch_details(self, package_names):
+        """
+        get the details of a list of apps using bulk_details. if the bulk request fails,
+        the apps will fall back to requesting their details one by one in visit_app.
+        apps whose details are already in the details store, or complete in the light crawl store are skipped
+        :param package_names: the apps to get details from
+        :return: a dict mapping package names to their details
+        """
+
+        package_names = [package_name for package_name in package_names
+                         if package_name not in self.details_store and not self.has_light_details(package_name)]
+        if not package_names:
+            return {}
+
+        try:
+            return self.bulk_details(package_names)
+        except Exception as e:
+            logging.error('error: ' + str(e) + ".\n Bulk details failed. Falling back to single details requests.")
+            return {}
+
+    def try_visit_app(self, package_name, details=None):
+        """
+        visit an app, skipping it when it fails. failed requests are already retried with backoff by request()
+        :param package_name: the app to visit
+        :param details: the details of the app if they were already fetched using bulk_details
+        :return: a list of related apps to visit next, empty if the app could not be visited
+        """
+
+        try:
+            return self.visit_app(package_name, details)
+
+        except Exception as e:
+            print('Error:', str(e))
+            logging.critical('critical error: ' + str(e) + ".\n Skipping this app and moving on to the next")
+            return []
+
+    def crawl(self, package_name, visited_packages=None, max_iterations=1, details=None, order=FRONTIER_ORDER,
+              workers=WORKERS, checkpoint=None):
         """
         crawls through the google play store, provided with a starting package
-        This is a recursive function. it crawls through the app, gets the information,
-        the apk file and the related apps and moves on crawling through the related apps using recursion
+        it crawls through the app, gets the information, the apk file and the related apps
+        and schedules the related apps in a frontier to crawl through next.
+        the starting package is always visited, related apps are only scheduled while
+        the total amount of visited and scheduled apps stays below max_iterations
         :param package_name: the package to start from
-        :param visited_packages: a list of packages already visited
+        :param visited_packages: a visited set of packages already visited, see visited.py
         :param max_iterations: the (max) amount of apps to crawl through
+        :param details: the details of the starting package if they were already fetched using bulk_details
+        :param order: the order to visit the related apps in, one of frontier.ORDERS
+        :param workers: the amount of apps to visit at the same time
+        :param checkpoint: the Checkpoint to store the state of the crawl in, so it can be resumed
+        """
+
+        prefetched = {package_name: details} if details is not None else {}
+        self.crawl_packages([package_name], visited_packages, max_iterations, order, workers, prefetched, checkpoint)
+
+    def crawl_packages(self, package_names, visited_packages=None, max_iterations=1, order=FRONTIER_ORDER,
+                       workers=WORKERS, prefetched=None, checkpoint=None):
+        """
+        crawls through the google play store, provided with a list of starting packages
+        :param package_names: the packages to start from, these are always visited
+        :param visited_packages: a visited set of packages already visited, see visited.py
+        :param max_iterations: the (max) amount of apps to crawl through
+        :param order: the order to visit the related apps in, one of frontier.ORDERS
+        :param workers: the amount of apps to visit at the same time
+        :param prefetched: a dict mapping package names to details that were already fetched
+        :param checkpoint: the Checkpoint to store the state of the crawl in, so it can be resumed
         """
 
         if visited_packages is None:
-            visited_packages = []
-        time.sleep(WAIT)
-        self.iter += 1
-        crawl_next = []
+            visited_packages = MemoryVisitedSet()
+        elif isinstance(visited_packages, list):
+            visited_packages = MemoryVisitedSet(visited_packages)
+        visited_packages.update(package_names)
 
-        try:
-            crawl_next = self.visit_app(package_name)
+        frontier = Frontier(order, 0)
+        for package in package_names:
+            frontier.push(package)
+        frontier.max_size = FRONTIER_SIZE
 
-        except Exception as e:
-            print('Error:', str(e))
+        if checkpoint is not None:
+            checkpoint.start(order, max_iterations, self.iter)
+            checkpoint.scheduled([(package, 0) for package in package_names])
 
-            if "Server busy" in str(e):  # in case of a timeout, we have to wait a while to be able to request again.
-                logging.error(
-                    'error: ' + str(e) + ".\n Server Timeout. Waiting 10 min and tying again. attempt 1 out of 5")
-                time.sleep(600)
-                for i in range(4):
-                    try:
-                        crawl_next = self.visit_app(package_name)
+        self.crawl_frontier(frontier, visited_packages, max_iterations, workers, prefetched, checkpoint)
+
+    def resume_crawl(self, checkpoint, visited_packages=None, max_iterations=None, workers=WORKERS):
+        """
+        resume the crawl that was stored in a checkpoint
+        :param checkpoint: the Checkpoint the crawl was stored in
+        :param visited_packages: a visited set of packages already visited, see visited.py
+        :param max_iterations: the (max) amount of apps to crawl through, the value of the stored crawl by default
+        :param workers: the amount of apps to visit at the same time
+        """
+
+        state = checkpoint.load()
+        if state['finished']:
+            logging.info("the checkpointed crawl was already finished. nothing to resume")
+            return
+
+        if visited_packages is None:
+            visited_packages = MemoryVisitedSet()
+        visited_packages.update(checkpoint.visited())
 
+        frontier = Frontier(state['order'], 0)
+        for package, priority in state['frontier']:
+            frontier.push(package, priority)
+        frontier.max_size = FRONTIER_SIZE
+
+        self.iter = state['iteration']
+        if max_iterations is None:
+            max_iterations = state['max_iterations']
+
+        logging.info("resuming crawl on iteration " + str(self.iter) + " with " + str(len(frontier)) +
+                     " scheduled apps")
+        self.crawl_frontier(frontier, visited_packages, max_iterations, workers, None, checkpoint)
+
+    def crawl_frontier(self, frontier, visited_packages, max_iterations, workers=WORKERS, prefetched=None,
+                       checkpoint=None):
+        """
+        crawls through the apps in the frontier until it is empty.
+        an app is only taken from the frontier when a worker is free, so the apps found by the visits that are
+        still running can go first. the details of the next BULK_DETAILS_SIZE apps in the frontier are fetched
+        in bulk ahead of time, and the apps are visited by a pool of worker threads.
+        the pace of the requests is set by the rate limiter.
+        only this thread touches the frontier, the visited set and the checkpoint, the workers only visit apps
+        and hand the related apps back
+        :param frontier: the Frontier with the apps to visit
+        :param visited_packages: a visited set of packages already visited or scheduled, see visited.py
+        :param max_iterations: the (max) amount of apps to crawl through
+        :param workers: the amount of apps to visit at the same time
+        :param prefetched: a dict mapping package names to details that were already fetched
+        :param checkpoint: the Checkpoint to store the state of the crawl in, so it can be resumed
+        """
+
+        if prefetched is None:
+            prefetched = {}
+        if workers > 1:
+            for session in (self.session, self.web_session):
+                adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+                session.mount('https://', adapter)
+
+        # the apps whose details were asked for in bulk already, whether that worked or not
+        looked_ahead = set(prefetched)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while frontier or running:
+                while frontier and len(running) < workers:
+                    # look at the next apps without taking them, so their details can be fetched in one request
+                    if frontier.peek()[0] not in looked_ahead:
+                        lookahead = [p for p in frontier.peek(BULK_DETAILS_SIZE) if p not in looked_ahead]
+                        looked_ahead.update(lookahead)
+                        prefetched.update(self.prefetch_details(lookahead))
+
+                    package = frontier.pop()
+                    looked_ahead.discard(package)
+                    self.iter += 1
+                    if checkpoint is not None:
+                        checkpoint.popped([package])
+                    future = executor.submit(self.try_visit_app, package, prefetched.pop(package, None))
+                    running[future] = package
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    package = running.pop(future)
+                    try:
+                        crawl_next = future.result()
                     except Exception as e:
-                        print('Error:', str(e))
-                        logging.critical(
-                            'critical error: ' + str(e) + ".\n trying again. Waiting 10 min. attempt " + str(
-                                i + 2) + " out of 5")
-                        time.sleep(600)
-                        if i == 3:
-                            logging.info("moving on to the next app")
-                            return
-
-            else:  # in case of a response error, we wait a short while and try again.
-                logging.error('error: ' + str(e) + ".\n Probably a server timeout. Waiting 60 sec and trying again.")
-                time.sleep(60)
-
-                try:
-                    crawl_next = self.visit_app(package_name)
-
-                except Exception as e:
-                    print('Error:', str(e))
-                    logging.critical(
-                        'critical error: ' + str(e) + ".\n Second try failed. Skipping this app and moving "
-                                                      "on to the next")
-                    time.sleep(10)
-                    return
-
-        for app in crawl_next:
-            if app.docid not in visited_packages and self.iter < max_iterations:
-                visited_packages += [app.docid]
-                self.crawl(app.docid, visited_packages, max_iterations)
+                        logging.critical('critical error: ' + str(e) + ".\n Skipping " + package)
+                        crawl_next = []
+
+                    # the apps that are visited or waiting to be visited may not exceed max_iterations
+                    scheduled = self.iter + len(frontier)
+                    related_apps = []
+                    related_packages = set()
+                    for app in crawl_next:
+                        if app.docid not in visited_packages and app.docid not in related_packages \
+                                and scheduled + len(related_packages) < max_iterations:
+                            related_packages.add(app.docid)
+                            related_apps += [(app.docid, app.aggregateRating.ratingsCount)]
+
+                    scheduled_packages = frontier.extend(related_apps)
+                    visited_packages.update(scheduled_packages)
+
+                    if self.light:
+                        for app in crawl_next:
+                            if app.docid in scheduled_packages:
+                                # copy the app, so the whole list is not kept alive with it
+                                details = apkfetch_pb2.DocV2()
+                                details.CopyFrom(app)
+                                self.light_store.put(app.docid, details)
+
+                    if checkpoint is not None:
+                        checkpoint.finished(package)
+                        checkpoint.scheduled([app for app in related_apps if app[0] in scheduled_packages])
+
+                if checkpoint is not None:
+                    checkpoint.maybe_commit(self.iter)
+
+        if checkpoint is not None:
+            checkpoint.commit(self.iter, finished=True)
+
 
 
 def main(argv):
@@ -565,6 +1113,32 @@ def main(argv):
     parser.add_argument('--package', '-k', help='Package name of the app')
     parser.add_argument('--iterations', '-i', help='Amount of apps you want to crawl through', type=int)
     parser.add_argument("--list", '-l', help='file name to read the list of apps to crawl through from', type=str)
+    parser.add_argument('--order', '-o', help='order to crawl through related apps in', choices=ORDERS,
+                        default=FRONTIER_ORDER)
+    parser.add_argument('--workers', '-w', help='amount of apps to crawl through at the same time', type=int,
+                        default=WORKERS)
+    parser.add_argument('--rate', '-r', action='append', metavar='ENDPOINT=RATE',
+                        help='max requests per second to an endpoint, one of: ' + ", ".join(ENDPOINTS) +
+                             '. can be repeated')
+    parser.add_argument('--web-cache', action='store_true', default=WEB_CACHE,
+                        help='keep the pages of the website on disk and revalidate them using their ETag')
+    parser.add_argument('--response-cache', action='store_true', default=RESPONSE_CACHE,
+                        help='keep the details, reviews and related apps responses on disk and reuse them')
+    parser.add_argument('--light', action='store_true', default=LIGHT_CRAWL,
+                        help='visit related apps with the details the related apps list returns, and only request '
+                             'the full details when required fields are missing. only with STORE_INFO = False '
+                             'and without --archive, as the lists leave out the description and permissions')
+    parser.add_argument('--resume', action='store_true', help='resume the last crawl where it stopped')
+    parser.add_argument('--download-workers', help='amount of apps to download at the same time', type=int,
+                        default=DOWNLOAD_WORKERS)
+    parser.add_argument('--bandwidth', help='max bytes per second to download apps with', type=int,
+                        default=DOWNLOAD_BANDWIDTH)
+    parser.add_argument('--visited', '-v', help='how to keep track of visited apps', choices=VISITED_KINDS,
+                        default=VISITED_SET)
+    parser.add_argument('--output', help='the format to store the information in', choices=OUTPUT_FORMATS,
+                        default=OUTPUT_FORMAT)
+    parser.add_argument('--archive', action='store_true', default=ARCHIVE_DOCS,
+                        help='keep the raw details of every visited app in ' + ARCHIVE_PATH)
 
     #make sure logs exists
     if not os.path.isdir('logs'):
@@ -587,8 +1161,17 @@ def main(argv):
         package = args.package
         max_iterations = args.iterations
         app_list_file = args.list
-
-        if not user or not password or not android_id or (not package and not app_list_file):
+        order = args.order
+        visited_kind = args.visited
+        workers = args.workers
+        rates = parse_rates(args.rate, RATES)
+        resume = args.resume
+        page_cache = PageCache(WEB_CACHE_PATH) if args.web_cache else None
+        response_cache = None
+        if args.response_cache:
+            response_cache = ResponseCache(RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTL, RESPONSE_CACHE_SIZE)
+
+        if not user or not password or not android_id or (not package and not app_list_file and not resume):
             parser.print_usage()
             raise ValueError('user, passwd, androidid and package are required options. android ID can be found using '
                              'Device id on your android device using an app from the playstore')
@@ -597,8 +1180,13 @@ def main(argv):
             raise ValueError(
                 'you cannot fill in a starting package and a list of apps to crawl through. The crawler will start from the app_list_file')
 
+        writer = create_writer(args.output, OUTPUT_PATH, PermissionTemplate.load().permissions)
+
         # create class
-        apk = GooglePlayCrawler()
+        apk = GooglePlayCrawler(rates, page_cache, response_cache, args.light,
+                                ApkIndex(APK_INDEX_PATH) if DOWNLOAD_APPS else None,
+                                args.download_workers, args.bandwidth, writer,
+                                DocArchive(ARCHIVE_PATH) if args.archive else None)
         print("crawling through the playstore")
 
         # login
@@ -614,21 +1202,45 @@ def main(argv):
         logging.critical('authentication error:' + str(e) + ". terminating program")
         sys.exit(1)
 
-    visited_apps = apk.load_visited_apps()
-    if not app_list_file is None:
+    visited_apps = apk.load_visited_apps(
+        create_visited_set(visited_kind, VISITED_INDEX_PATH, BLOOM_CAPACITY, BLOOM_ERROR_RATE))
+    checkpoint = Checkpoint(CHECKPOINT_PATH)
+    checkpoint.before_commit.append(apk.writer.flush)
+    if apk.archive is not None:
+        checkpoint.before_commit.append(apk.archive.flush)
+    seeded = apk.seed_apk_index()
+    if seeded:
+        logging.info("added {} apks that were downloaded before to the apk index".format(seeded))
+    resumed = apk.downloads.resume() if DOWNLOAD_APPS else 0
+    if resumed:
+        logging.info("queueing {} apps that were not downloaded yet".format(resumed))
+
+    if resume:
+        apk.resume_crawl(checkpoint, visited_apps, max_iterations, workers)
+
+    elif not app_list_file is None:
         app_list = apk.load_app_list(app_list_file)
         logging.info("initiated crawling for " + str(len(app_list)) + " apps using list from file: " + app_list_file)
-        for app in app_list:
-            apk.crawl(app, [])
+        apk.crawl_packages(app_list, [], len(app_list), BFS, workers, checkpoint=checkpoint)
 
     elif package not in visited_apps or not NO_DUPLICATE_DATA:
         logging.info("initiated crawling for " + str(max_iterations) + " apps")
-        apk.crawl(package, visited_apps, max_iterations)
+        apk.crawl(package, visited_apps, max_iterations, order=order, workers=workers, checkpoint=checkpoint)
     else:
         print("package has been visited before. Pick a new package to start from or run resetcsvfiles.py to start over")
         logging.info(
             "package has been visited before. Pick a new package to start from or run resetcsvfiles.py to start over")
 
+    if len(apk.downloads):
+        print("waiting for {} downloads".format(len(apk.downloads)))
+    apk.close()
+    checkpoint.close()
+    visited_apps.close()
+    logging.info("requests per second at the end of the crawl: " + str(apk.limiter.rates()))
+    logging.info("backoff: " + apk.limiter.stats())
+    logging.info("downloads: " + apk.downloads.stats())
+    logging.info("downloaded: " + apk.downloader.bandwidth.stats())
+
     print("finished crawling")
     print("crawled through {} apps in {:.1f} seconds".format(apk.iter, time.time() - start_time))
     logging.info("crawled through {} apps in {:.1f} seconds".format(apk.iter, time.time() - start_time))
@@ -0,0 +1,479 @@
+import os
+import csv
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from schema import columns, column_names, KEY_COLUMNS, TABLES, APPINFO, REVIEWS, STRING, INT, FLOAT, BOOL
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+CSV = 'csv'  # a .csv file for every table
+PARQUET = 'parquet'  # a folder of parquet files for every table, this needs pyarrow
+SQLITE = 'sqlite'  # a table for every table in a single sqlite database
+FORMATS = (CSV, PARQUET, SQLITE)
+
+OUTPUT_ROW_GROUP_SIZE = 10000  # max amount of rows in a row group of a parquet file
+OUTPUT_FILE_SIZE = 100000  # amount of rows after which a parquet file is closed and a new one is started
+OUTPUT_COMPRESSION = 'zstd'  # the compression codec of the parquet files
+OUTPUT_DATABASE = 'output.db'  # the name of the sqlite database
+OUTPUT_BATCH_SIZE = 1000  # max amount of rows written to the sqlite database in a single transaction
+# the primary key columns of the sqlite tables: the package and the version of appinfo, or the KEY_COLUMNS
+SQLITE_KEYS = dict([(APPINFO, ('Pkgname', 'CurrentVersion'))] +
+                   [(table, ('Pkgname', column[0])) for table, column in KEY_COLUMNS.items()])
+OUTPUT_BUFFER_SIZE = 1024 * 1024  # bytes of rows to buffer per file before they are written to disk
+OUTPUT_FLUSH_INTERVAL = 5  # max seconds rows stay in the buffer before they are written to disk
+
+
+class CsvWriter(object):
+    """
+    appends rows to the .csv output files from a single background thread, so the crawler
+    can store apps from several threads at once without the rows of different apps interleaving.
+    the files stay open for as long as the writer runs. rows are buffered and written to disk once
+    the buffer of a file is full or every flush_interval seconds, and flush() also syncs them to disk
+    """
+
+    def __init__(self, directory, buffer_size=OUTPUT_BUFFER_SIZE, flush_interval=OUTPUT_FLUSH_INTERVAL):
+        """
+        :param directory: the folder with the .csv files
+        :param buffer_size: bytes of rows to buffer per file
+        :param flush_interval: max seconds rows stay in the buffer
+        """
+
+        self.directory = directory
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.files = {}
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='csv-writer')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def write(self, table, rows, keys=None):
+        """
+        queue rows to be appended to the .csv file of a table. the rows of a single call are always written together
+        :param table: one of schema.TABLES
+        :param rows: a list of rows
+        :param keys: the values of the KEY_COLUMNS of the rows, only stored by the sqlite output
+        """
+
+        self.queue.put((os.path.join(self.directory, table + '.csv'), rows))
+
+    def packages(self):
+        """
+        :return: an iterator over the package names in appinfo.csv
+        """
+
+        self.flush()
+        with open(os.path.join(self.directory, APPINFO + '.csv'), "r", encoding="utf8") as csv_file:
+            file = csv.reader(csv_file, delimiter=',', quotechar='"')
+
+            # skip the column names
+            next(file, None)
+            for row in file:
+                if row:
+                    yield row[0]
+
+    def versions(self):
+        """
+        :return: an iterator over the (package name, version code) of the rows in appinfo.csv
+        """
+
+        self.flush()
+        with open(os.path.join(self.directory, APPINFO + '.csv'), "r", encoding="utf8") as csv_file:
+            file = csv.reader(csv_file, delimiter=',', quotechar='"')
+            version_column = next(file, []).index('CurrentVersion')
+            for row in file:
+                if len(row) > version_column and row[version_column]:
+                    yield row[0], int(row[version_column])
+
+    def flush(self):
+        """
+        wait until all queued rows are written and synced to disk
+        """
+
+        if self.thread.is_alive():
+            done = threading.Event()
+            self.queue.put(done)
+            done.wait()
+
+    def close(self):
+        """
+        write all queued rows, close the files and stop the writer thread
+        """
+
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def _file(self, file_name):
+        """
+        :return: the open file and its csv writer
+        """
+
+        if file_name not in self.files:
+            csv_file = open(file_name, "a", encoding="utf8", buffering=self.buffer_size)
+            self.files[file_name] = (csv_file, csv.writer(csv_file, delimiter=',', quotechar='"',
+                                                          quoting=csv.QUOTE_MINIMAL))
+        return self.files[file_name]
+
+    def _flush(self, sync=False):
+        for file_name, (csv_file, _) in self.files.items():
+            try:
+                csv_file.flush()
+                if sync:
+                    os.fsync(csv_file.fileno())
+            except Exception as e:
+                logging.critical('critical error: ' + str(e) + ".\n Could not write to " + file_name)
+
+    def _run(self):
+        # the time the oldest row that was not written to disk yet was queued, None if all rows are written
+        dirty_since = None
+        while True:
+            try:
+                item = self.queue.get(timeout=None if dirty_since is None else
+                                      max(0.0, dirty_since + self.flush_interval - time.time()))
+            except queue.Empty:
+                item = False
+
+            if item is None:
+                self._flush(sync=True)
+                for csv_file, _ in self.files.values():
+                    csv_file.close()
+                self.files = {}
+                return
+            elif isinstance(item, threading.Event):
+                self._flush(sync=True)
+                dirty_since = None
+                item.set()
+            elif item:
+                file_name, rows = item
+                try:
+                    self._file(file_name)[1].writerows(rows)
+                    dirty_since = dirty_since or time.time()
+                except Exception as e:
+                    logging.critical('critical error: ' + str(e) + ".\n Could not write to " + file_name)
+
+            if dirty_since is not None and time.time() - dirty_since >= self.flush_interval:
+                self._flush()
+                dirty_since = None
+
+
+class ParquetWriter(object):
+    """
+    writes every table as a folder of typed, compressed and columnar parquet files, with the types of schema.COLUMNS.
+    rows are buffered and written in row groups of row_group_size rows to a file that stays open until it holds
+    file_size rows. a parquet file can only be read once it is closed, so an open file is named _<name>.parquet,
+    which pyarrow skips, and every row that goes into it is also appended to the journal _<name>.jsonl by flush().
+    the file is renamed to <name>.parquet once it is closed and its journal is removed. the rows of a file that was
+    still open when the crawler stopped are written again from its journal.
+    the files of a table are read together with pyarrow.parquet.read_table(folder, columns=[...])
+    """
+
+    def __init__(self, directory, permissions=(), row_group_size=OUTPUT_ROW_GROUP_SIZE, file_size=OUTPUT_FILE_SIZE,
+                 compression=OUTPUT_COMPRESSION):
+        """
+        :param directory: the folder to create the folders of the tables in
+        :param permissions: the permissions of the template, the columns of the permissions table
+        :param row_group_size: max amount of rows in a row group
+        :param file_size: amount of rows after which a file is closed and the next rows go to a new file
+        :param compression: the compression codec
+        """
+
+        if pyarrow is None:
+            raise ImportError('the parquet output needs pyarrow. install it with: pip install pyarrow')
+
+        self.directory = directory
+        self.permissions = list(permissions)
+        self.row_group_size = row_group_size
+        self.file_size = file_size
+        self.compression = compression
+        self.types = {STRING: pyarrow.string(), INT: pyarrow.int64(), FLOAT: pyarrow.float64(), BOOL: pyarrow.bool_()}
+        self.lock = threading.Lock()
+        self.rows = {}  # the rows of every table that are not written to a row group yet
+        self.unjournaled = {}  # the rows of every table that are not appended to the journal yet
+        self.files = {}  # the name, parquet writer and amount of rows of the open file of every table
+        for table in TABLES:
+            self._recover(table)
+
+    def _schema(self, table):
+        return pyarrow.schema([(name, self.types[kind]) for name, kind in columns(table, self.permissions)])
+
+    def _folder(self, table):
+        return os.path.join(self.directory, table)
+
+    def _path(self, table, name, extension, open_file=True):
+        return os.path.join(self._folder(table), ('_' if open_file else '') + name + extension)
+
+    def _recover(self, table):
+        """
+        write the journaled rows of the files that were still open when the crawler stopped to a new file
+        """
+
+        folder = self._folder(table)
+        if not os.path.isdir(folder):
+            return
+
+        for journal_name in sorted(os.listdir(folder)):
+            if not (journal_name.startswith('_') and journal_name.endswith('.jsonl')):
+                continue
+            name = journal_name[1:-len('.jsonl')]
+            if not os.path.exists(self._path(table, name, '.parquet', open_file=False)):
+                with open(self._path(table, name, '.jsonl'), "r", encoding="utf8") as journal:
+                    rows = [json.loads(line) for line in journal if line.endswith('\n')]
+                logging.info("writing " + str(len(rows)) + " " + table + " rows of an unfinished parquet file again")
+                self.rows.setdefault(table, []).extend(rows)
+                self.unjournaled.setdefault(table, []).extend(rows)
+                self._journal(table)
+
+            if os.path.exists(self._path(table, name, '.parquet')):
+                os.remove(self._path(table, name, '.parquet'))
+            os.remove(self._path(table, name, '.jsonl'))
+
+    def _open(self, table):
+        """
+        :return: the open file of a table, a new one if it has none
+        """
+
+        if table not in self.files:
+            folder = self._folder(table)
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+            name = datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
+            open(self._path(table, name, '.jsonl'), "w", encoding="utf8").close()
+            self.files[table] = [name, pyarrow.parquet.ParquetWriter(self._path(table, name, '.parquet'),
+                                                                     self._schema(table),
+                                                                     compression=self.compression), 0]
+        return self.files[table]
+
+    def _journal(self, table):
+        """
+        append the rows of a table that are not journaled yet to the journal of its open file, and sync it to disk
+        """
+
+        rows = self.unjournaled.pop(table, [])
+        if not rows:
+            return
+
+        with open(self._path(table, self._open(table)[0], '.jsonl'), "a", encoding="utf8") as journal:
+            journal.writelines(json.dumps(row) + '\n' for row in rows)
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _close(self, table):
+        """
+        close the open file of a table, so it can be read, and remove its journal
+        """
+
+        name, parquet_file, _ = self.files.pop(table)
+        parquet_file.close()
+        with open(self._path(table, name, '.parquet'), "rb") as written_file:
+            os.fsync(written_file.fileno())
+        os.replace(self._path(table, name, '.parquet'), self._path(table, name, '.parquet', open_file=False))
+        os.remove(self._path(table, name, '.jsonl'))
+        # the rows that were not journaled yet are all in the closed file
+        self.unjournaled.pop(table, None)
+
+    def write(self, table, rows, keys=None):
+        """
+        buffer rows of a table, and write a row group once enough rows are buffered
+        :param table: one of schema.TABLES
+        :param rows: a list of rows
+        :param keys: the values of the KEY_COLUMNS of the rows, only stored by the sqlite output
+        """
+
+        with self.lock:
+            self.rows.setdefault(table, []).extend(rows)
+            self.unjournaled.setdefault(table, []).extend(rows)
+            if len(self.rows[table]) >= self.row_group_size:
+                self._write_rows(table)
+
+    def _write_rows(self, table):
+        rows = self.rows.pop(table, [])
+        if not rows:
+            return
+
+        schema = self._schema(table)
+        data = pyarrow.Table.from_arrays([pyarrow.array([row[i] for row in rows], type=field.type)
+                                          for i, field in enumerate(schema)], schema=schema)
+
+        open_file = self._open(table)
+        open_file[1].write_table(data, row_group_size=self.row_group_size)
+        open_file[2] += len(rows)
+        if open_file[2] >= self.file_size:
+            self._close(table)
+
+    def flush(self):
+        """
+        journal all rows that are not in a closed file yet, so they are on disk without closing the open files
+        """
+
+        with self.lock:
+            for table in list(self.unjournaled):
+                self._journal(table)
+
+    def close(self):
+        """
+        write all buffered rows and close the files
+        """
+
+        with self.lock:
+            for table in list(self.rows):
+                self._write_rows(table)
+            for table in list(self.files):
+                self._close(table)
+
+    def packages(self):
+        """
+        :return: an iterator over the package names in the appinfo files, reading only the Pkgname column
+                 of the closed files and the journal of the open file
+        """
+
+        self.flush()
+        folder = self._folder(APPINFO)
+        if not os.path.isdir(folder):
+            return
+        for name in sorted(os.listdir(folder)):
+            if name.endswith('.parquet') and not name.startswith('_'):
+                for package in pyarrow.parquet.read_table(os.path.join(folder, name), columns=['Pkgname']).column(0):
+                    yield package.as_py()
+            elif name.startswith('_') and name.endswith('.jsonl'):
+                with open(os.path.join(folder, name), "r", encoding="utf8") as journal:
+                    for line in journal:
+                        yield json.loads(line)[0]
+
+    def versions(self):
+        """
+        :return: an iterator over the (package name, version code) of the rows in the appinfo files
+        """
+
+        self.flush()
+        folder = self._folder(APPINFO)
+        if not os.path.isdir(folder):
+            return
+        version_column = column_names(APPINFO).index('CurrentVersion')
+        for name in sorted(os.listdir(folder)):
+            if name.endswith('.parquet') and not name.startswith('_'):
+                data = pyarrow.parquet.read_table(os.path.join(folder, name), columns=['Pkgname', 'CurrentVersion'])
+                for package, version in zip(data.column(0).to_pylist(), data.column(1).to_pylist()):
+                    yield package, version
+            elif name.startswith('_') and name.endswith('.jsonl'):
+                with open(os.path.join(folder, name), "r", encoding="utf8") as journal:
+                    for line in journal:
+                        row = json.loads(line)
+                        yield row[0], row[version_column]
+
+
+class SqliteWriter(object):
+    """
+    writes the tables to an sqlite database. a row replaces the stored row with the same primary key:
+    the package and version for the tables about an app and the package and review id for reviews,
+    so crawling an app again updates it instead of adding duplicates. the tables have the columns of
+    the .csv files, and the KEY_COLUMNS the .csv files do not have as their last column.
+    rows are written in transactions of up to batch_size rows, and flush() commits the open transaction
+    """
+
+    def __init__(self, path, permissions=(), batch_size=OUTPUT_BATCH_SIZE):
+        """
+        :param path: the database file
+        :param permissions: the permissions of the template, the columns of the permissions table
+        :param batch_size: max amount of rows in a transaction
+        """
+
+        self.path = path
+        self.permissions = list(permissions)
+        self.batch_size = batch_size
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.types = {STRING: 'TEXT', INT: 'INTEGER', FLOAT: 'REAL', BOOL: 'INTEGER'}
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.statements = {}
+        for table in TABLES:
+            table_columns = columns(table, self.permissions) + ([KEY_COLUMNS[table]] if table in KEY_COLUMNS else [])
+            keys = SQLITE_KEYS[table]
+            names = ['"{}"'.format(name) for name, _ in table_columns]
+            self.db.execute('CREATE TABLE IF NOT EXISTS {} ({}, PRIMARY KEY ({}))'.format(
+                table, ", ".join('"{}" {}'.format(name, self.types[kind]) for name, kind in table_columns),
+                ", ".join('"{}"'.format(key) for key in keys)))
+            updates = ['"{0}" = excluded."{0}"'.format(name) for name, _ in table_columns if name not in keys]
+            self.statements[table] = 'INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO UPDATE SET {}'.format(
+                table, ", ".join(names), ", ".join('?' * len(names)), ", ".join('"{}"'.format(key) for key in keys),
+                ", ".join(updates))
+        self.db.commit()
+
+    def write(self, table, rows, keys=None):
+        """
+        insert or update rows of a table, and commit once batch_size rows are written
+        :param table: one of schema.TABLES
+        :param rows: a list of rows
+        :param keys: the values of the KEY_COLUMNS of the rows, for the tables that have one
+        """
+
+        if table in KEY_COLUMNS:
+            rows = [list(row) + [key] for row, key in zip(rows, keys or [None] * len(rows))]
+        with self.lock:
+            try:
+                self.db.executemany(self.statements[table], rows)
+            except Exception as e:
+                logging.critical('critical error: ' + str(e) + ".\n Could not write to " + table)
+                return
+
+            self.pending += len(rows)
+            if self.pending >= self.batch_size:
+                self.db.commit()
+                self.pending = 0
+
+    def flush(self):
+        """
+        commit all written rows
+        """
+
+        with self.lock:
+            self.db.commit()
+            self.pending = 0
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+    def packages(self):
+        """
+        :return: an iterator over the package names in the appinfo table
+        """
+
+        with self.lock:
+            rows = self.db.execute('SELECT DISTINCT Pkgname FROM {}'.format(APPINFO)).fetchall()
+        return (row[0] for row in rows)
+
+    def versions(self):
+        """
+        :return: an iterator over the (package name, version code) of the rows in the appinfo table
+        """
+
+        with self.lock:
+            return iter(self.db.execute('SELECT Pkgname, CurrentVersion FROM {}'.format(APPINFO)).fetchall())
+
+
+def create_writer(kind, directory, permissions=()):
+    """
+    :param kind: one of FORMATS
+    :param directory: the folder to write the output to
+    :param permissions: the permissions of the template, the columns of the permissions table
+    :return: a writer with write, flush, close, packages and versions methods
+    """
+
+    if kind == PARQUET:
+        return ParquetWriter(directory, permissions)
+    if kind == SQLITE:
+        return SqliteWriter(os.path.join(directory, OUTPUT_DATABASE), permissions)
+    return CsvWriter(directory)
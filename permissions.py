@@ -0,0 +1,68 @@
+import csv
+
+COLUMNS = 'columns'  # a 0 or 1 column for every permission of the template in permissions.csv
+PACKED = 'packed'  # a single hex bitset column in permissionbits.csv
+PERMISSION_FORMATS = (COLUMNS, PACKED)
+
+
+class PermissionTemplate(object):
+    """
+    the permissions that are the columns of permissions.csv, with an index from permission name to column.
+    the permissions of an app are turned into a bitset in which bit i is set if the app has the permission of column i
+    """
+
+    def __init__(self, permissions):
+        """
+        :param permissions: the list of permissions, in column order
+        """
+
+        self.permissions = list(permissions)
+        self.index = dict((permission, column) for column, permission in enumerate(self.permissions))
+
+    @classmethod
+    def load(cls, path="templatePermissions.csv"):
+        """
+        :param path: the .csv file with a permission in the first column of every row
+        :return: the template of the permissions in the file
+        """
+
+        with open(path, "r", encoding="utf8") as permissions_file:
+            return cls([row[0] for row in csv.reader(permissions_file, delimiter=',', quotechar='"')])
+
+    def __len__(self):
+        return len(self.permissions)
+
+    def bitset(self, permissions):
+        """
+        :param permissions: the permissions of an app
+        :return: the bitset of the permissions that are in the template
+        """
+
+        bits = 0
+        for permission in permissions:
+            column = self.index.get(permission)
+            if column is not None:
+                bits |= 1 << column
+        return bits
+
+    def row(self, bits):
+        """
+        :return: a 0 or 1 for every permission of the template
+        """
+
+        return [(bits >> column) & 1 for column in range(len(self.permissions))]
+
+    def pack(self, bits):
+        """
+        :return: the bitset as a hex string with a fixed width, the last character holds the first 4 permissions
+        """
+
+        return format(bits, '0{}x'.format((len(self.permissions) + 3) // 4))
+
+    @staticmethod
+    def unpack(packed):
+        """
+        :return: the bitset of a hex string made by pack
+        """
+
+        return int(packed, 16)
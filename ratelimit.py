@@ -0,0 +1,284 @@
+import time
+import random
+import logging
+import threading
+
+DETAILS = 'details'  # the details and bulkDetails endpoints
+REVIEWS = 'reviews'  # the reviews endpoint
+DELIVERY = 'delivery'  # the purchase and delivery endpoints
+RELATED = 'related'  # the related apps lists
+WEB = 'web'  # the play.google.com website
+ENDPOINTS = (DETAILS, REVIEWS, DELIVERY, RELATED, WEB)
+
+DECREASE = 0.5  # the rate is multiplied by this when the server is busy
+INCREASE = 0.05  # the rate is increased by this for every successful request, up to the configured rate
+MIN_RATE = 0.05  # the rate never drops below this fraction of the configured rate
+
+BUSY = 'busy'  # the server is busy or throttling us
+ERROR = 'error'  # the request failed with a server error or did not get a response at all
+BACKOFF = {BUSY: (30, 600), ERROR: (2, 60)}  # the (first, max) amount of seconds to back off per failure class
+MAX_RETRIES = {BUSY: 5, ERROR: 3}  # the amount of times a request is retried per failure class
+BREAKER_THRESHOLD = 5  # the amount of failed requests in a row that pauses an endpoint for the max delay
+THROUGHPUT_INTERVAL = 10  # seconds between two log messages with the download throughput
+
+
+class TokenBucket(object):
+    """
+    allows rate requests per second on average, with bursts of up to burst requests.
+    the rate adapts to the server: it drops when the server reports it is busy
+    and slowly climbs back up to max_rate while requests succeed
+    """
+
+    def __init__(self, rate, burst=None, min_rate=MIN_RATE):
+        """
+        :param rate: the max amount of tokens per second
+        :param burst: the max amount of tokens to take at once, the rate if None
+        :param min_rate: the fraction of rate the rate never drops below
+        """
+
+        self.max_rate = self.rate = float(rate)
+        self.min_rate = self.max_rate * min_rate
+        self.burst = float(burst or max(1.0, self.rate))
+        self.tokens = self.burst
+        self.last = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        take tokens, waiting until they are available. waiting threads are served in the order they arrived
+        :param amount: the amount of tokens to take
+        :return: the amount of seconds spent waiting
+        """
+
+        with self.lock:
+            now = time.time()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * DECREASE)
+
+    def succeeded(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + INCREASE)
+
+
+class RateLimiter(object):
+    """
+    a token bucket for every endpoint, endpoints without a rate are not limited.
+    it also backs off per endpoint: a failed request pauses the requests to its endpoint only,
+    for an exponentially growing delay with jitter. the failures in a row are counted per endpoint and failure class,
+    so busy answers do not make the backoff after errors grow and the other way around. after BREAKER_THRESHOLD
+    failures of a class in a row the circuit breaker of the endpoint opens and pauses it for the max delay of the class
+    """
+
+    def __init__(self, rates):
+        """
+        :param rates: a dict mapping endpoints to the max amount of requests per second
+        """
+
+        self.buckets = dict((endpoint, TokenBucket(rate)) for endpoint, rate in rates.items() if rate)
+        self.lock = threading.Lock()
+        self.failures = {}  # the amount of failures in a row per endpoint and failure class
+        self.paused_until = dict((endpoint, 0) for endpoint in ENDPOINTS)
+        self.failure_counts = {}
+        self.backoff_seconds = {}
+
+    def acquire(self, endpoint):
+        """
+        wait until a request to the endpoint is allowed
+        :param endpoint: one of ENDPOINTS
+        :return: the amount of seconds spent waiting
+        """
+
+        waited = 0
+        while True:
+            with self.lock:
+                pause = self.paused_until.get(endpoint, 0) - time.time()
+            if pause <= 0:
+                break
+
+            time.sleep(pause)
+            waited += pause
+
+        if endpoint in self.buckets:
+            waited += self.buckets[endpoint].acquire()
+        return waited
+
+    def report(self, endpoint, status_code=200, error_message=""):
+        """
+        adapt the rate of an endpoint to how the server handled the last request,
+        and pause the endpoint if the request failed
+        :param endpoint: one of ENDPOINTS
+        :param status_code: the http status code of the response, None if there was no response
+        :param error_message: the error message the server returned, if any
+        :return: the failure class of the request (BUSY or ERROR), or None if it should not be retried
+        """
+
+        if status_code in (429, 503) or "Server busy" in error_message:
+            failure = BUSY
+        elif status_code is None or status_code >= 500:
+            failure = ERROR
+        else:
+            failure = None
+
+        if endpoint in self.buckets:
+            if failure == BUSY:
+                self.buckets[endpoint].throttled()
+            elif failure is None and status_code < 400 and not error_message:
+                self.buckets[endpoint].succeeded()
+
+        with self.lock:
+            if failure is None:
+                for key in BACKOFF:
+                    self.failures.pop((endpoint, key), None)
+                return None
+
+            key = (endpoint, failure)
+            self.failures[key] = failures = self.failures.get(key, 0) + 1
+            self.failure_counts[key] = self.failure_counts.get(key, 0) + 1
+
+            base, cap = BACKOFF[failure]
+            if failures >= BREAKER_THRESHOLD:
+                delay = cap
+                logging.error("circuit breaker opened: " + str(failures) + " " + failure + " " + endpoint +
+                              " requests in a row. pausing " + endpoint + " requests for {:.0f} sec".format(delay))
+            else:
+                # full jitter: a random delay between 0 and the exponentially growing max delay
+                delay = random.uniform(0, min(cap, base * 2 ** (failures - 1)))
+
+            # only the time the pause is extended by is counted, so every second the endpoint is paused counts once,
+            # however many threads wait for it
+            now = time.time()
+            paused_until = max(self.paused_until.get(endpoint, 0), now)
+            if now + delay > paused_until:
+                self.backoff_seconds[key] = self.backoff_seconds.get(key, 0) + now + delay - paused_until
+                self.paused_until[endpoint] = now + delay
+        return failure
+
+    def rates(self):
+        """
+        :return: a dict mapping endpoints to their current rate
+        """
+
+        return dict((endpoint, bucket.rate) for endpoint, bucket in self.buckets.items())
+
+    def stats(self):
+        """
+        :return: a string with the amount of failures and the seconds spent backing off per endpoint and failure class
+        """
+
+        with self.lock:
+            keys = sorted(set(self.failure_counts) | set(self.backoff_seconds))
+            return ", ".join("{} {}: {} failures, {:.1f} sec backing off".format(
+                endpoint, failure, self.failure_counts.get((endpoint, failure), 0),
+                self.backoff_seconds.get((endpoint, failure), 0)) for endpoint, failure in keys) or "no failures"
+
+
+class BandwidthLimiter(object):
+    """
+    shares a max amount of bytes per second between all downloads. every stream takes its bytes in slices of
+    a tenth of a second of its fair share, and the slices are handed out in the order they are asked for,
+    so the active streams get an equal share and a stream that is slower than its share leaves the rest to the others.
+    it also measures the throughput of the downloads per host
+    """
+
+    def __init__(self, rate=None, interval=THROUGHPUT_INTERVAL):
+        """
+        :param rate: the max amount of bytes per second, None for no limit
+        :param interval: the amount of seconds between two throughput log messages
+        """
+
+        self.rate = rate
+        self.bucket = TokenBucket(rate) if rate else None
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.active = 0
+        self.host_bytes = {}
+        self.total = 0
+        self.started = self.window_start = time.time()
+        self.window_bytes = 0
+
+    def open(self):
+        """
+        register a stream that started downloading
+        """
+
+        with self.lock:
+            self.active += 1
+
+    def close(self):
+        """
+        register a stream that stopped downloading
+        """
+
+        with self.lock:
+            self.active -= 1
+
+    def consume(self, amount, host):
+        """
+        wait until a stream is allowed to write the bytes it downloaded
+        :param amount: the amount of bytes
+        :param host: the host the bytes were downloaded from
+        """
+
+        if self.bucket is not None:
+            with self.lock:
+                slice_size = max(1, int(self.rate / max(1, self.active) / 10))
+            while amount > 0:
+                self.bucket.acquire(min(amount, slice_size))
+                self._account(min(amount, slice_size), host)
+                amount -= slice_size
+        else:
+            self._account(amount, host)
+
+    def _account(self, amount, host):
+        message = None
+        with self.lock:
+            self.total += amount
+            self.host_bytes[host] = self.host_bytes.get(host, 0) + amount
+            self.window_bytes += amount
+            now = time.time()
+            if now - self.window_start >= self.interval:
+                message = "download throughput: {:.1f} KB/s, {} active downloads".format(
+                    self.window_bytes / (now - self.window_start) / 1024, self.active)
+                self.window_start = now
+                self.window_bytes = 0
+        if message:
+            logging.info(message)
+
+    def stats(self):
+        """
+        :return: a string with the amount of bytes downloaded per host and the average throughput
+        """
+
+        with self.lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            hosts = ", ".join("{}: {:.1f} MB".format(host, amount / 1024 ** 2)
+                              for host, amount in sorted(self.host_bytes.items()))
+            return "{:.1f} MB at {:.1f} KB/s on average{}".format(self.total / 1024 ** 2, self.total / elapsed / 1024,
+                                                                  " (" + hosts + ")" if hosts else "")
+
+
+def parse_rates(values, defaults):
+    """
+    parse rates from the command line
+    :param values: a list of ENDPOINT=RATE strings
+    :param defaults: a dict of rates for the endpoints that are not in values
+    :return: a dict mapping endpoints to their rate
+    """
+
+    rates = dict(defaults)
+    for value in values or []:
+        endpoint, _, rate = value.partition('=')
+        if endpoint not in ENDPOINTS:
+            raise ValueError('unknown endpoint: ' + endpoint + '. pick one of: ' + ", ".join(ENDPOINTS))
+        rates[endpoint] = float(rate)
+    return rates
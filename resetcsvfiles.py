@@ -1,8 +1,12 @@
 from __future__ import print_function
 
+import os
 import sys
 import csv
+import shutil
 from lxml import html
+from output import OUTPUT_DATABASE
+from schema import column_names, TABLES, APPINFO, PERMISSIONS, PERMISSION_BITS, EXTERNAL_PERMISSIONS, IMAGES, REVIEWS
 
 PAGE = '<li class="devsite-nav-item"><a href="#ACCEPT_HANDOVER" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.0"><span class="devsite-nav-text">ACCEPT_HANDOVER</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_BACKGROUND_LOCATION" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.1"><span class="devsite-nav-text">ACCESS_BACKGROUND_LOCATION</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_CHECKIN_PROPERTIES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.2"><span class="devsite-nav-text">ACCESS_CHECKIN_PROPERTIES</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_COARSE_LOCATION" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.3"><span class="devsite-nav-text">ACCESS_COARSE_LOCATION</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_FINE_LOCATION" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.4"><span class="devsite-nav-text">ACCESS_FINE_LOCATION</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_LOCATION_EXTRA_COMMANDS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.5"><span class="devsite-nav-text">ACCESS_LOCATION_EXTRA_COMMANDS</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_MEDIA_LOCATION" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.6"><span class="devsite-nav-text">ACCESS_MEDIA_LOCATION</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_NETWORK_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.7"><span class="devsite-nav-text">ACCESS_NETWORK_STATE</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_NOTIFICATION_POLICY" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.8"><span class="devsite-nav-text">ACCESS_NOTIFICATION_POLICY</span></a></li><li class="devsite-nav-item"><a href="#ACCESS_WIFI_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.9"><span class="devsite-nav-text">ACCESS_WIFI_STATE</span></a></li><li class="devsite-nav-item"><a href="#ACCOUNT_MANAGER" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.10"><span class="devsite-nav-text">ACCOUNT_MANAGER</span></a></li><li class="devsite-nav-item"><a href="#ACTIVITY_RECOGNITION" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.11"><span class="devsite-nav-text">ACTIVITY_RECOGNITION</span></a></li><li class="devsite-nav-item"><a href="#ADD_VOICEMAIL" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.12"><span class="devsite-nav-text">ADD_VOICEMAIL</span></a></li><li class="devsite-nav-item"><a href="#ANSWER_PHONE_CALLS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.13"><span class="devsite-nav-text">ANSWER_PHONE_CALLS</span></a></li><li class="devsite-nav-item"><a href="#BATTERY_STATS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.14"><span class="devsite-nav-text">BATTERY_STATS</span></a></li><li class="devsite-nav-item"><a href="#BIND_ACCESSIBILITY_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.15"><span class="devsite-nav-text">BIND_ACCESSIBILITY_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_APPWIDGET" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.16"><span class="devsite-nav-text">BIND_APPWIDGET</span></a></li><li class="devsite-nav-item"><a href="#BIND_AUTOFILL_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.17"><span class="devsite-nav-text">BIND_AUTOFILL_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_CALL_REDIRECTION_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.18"><span class="devsite-nav-text">BIND_CALL_REDIRECTION_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_CARRIER_MESSAGING_CLIENT_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.19"><span class="devsite-nav-text">BIND_CARRIER_MESSAGING_CLIENT_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_CARRIER_MESSAGING_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.20"><span class="devsite-nav-text">BIND_CARRIER_MESSAGING_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_CARRIER_SERVICES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.21"><span class="devsite-nav-text">BIND_CARRIER_SERVICES</span></a></li><li class="devsite-nav-item"><a href="#BIND_CHOOSER_TARGET_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.22"><span class="devsite-nav-text">BIND_CHOOSER_TARGET_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_CONDITION_PROVIDER_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.23"><span class="devsite-nav-text">BIND_CONDITION_PROVIDER_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_DEVICE_ADMIN" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.24"><span class="devsite-nav-text">BIND_DEVICE_ADMIN</span></a></li><li class="devsite-nav-item"><a href="#BIND_DREAM_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.25"><span class="devsite-nav-text">BIND_DREAM_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_INCALL_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.26"><span class="devsite-nav-text">BIND_INCALL_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_INPUT_METHOD" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.27"><span class="devsite-nav-text">BIND_INPUT_METHOD</span></a></li><li class="devsite-nav-item"><a href="#BIND_MIDI_DEVICE_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.28"><span class="devsite-nav-text">BIND_MIDI_DEVICE_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_NFC_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.29"><span class="devsite-nav-text">BIND_NFC_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_NOTIFICATION_LISTENER_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.30"><span class="devsite-nav-text">BIND_NOTIFICATION_LISTENER_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_PRINT_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.31"><span class="devsite-nav-text">BIND_PRINT_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_QUICK_SETTINGS_TILE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.32"><span class="devsite-nav-text">BIND_QUICK_SETTINGS_TILE</span></a></li><li class="devsite-nav-item"><a href="#BIND_REMOTEVIEWS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.33"><span class="devsite-nav-text">BIND_REMOTEVIEWS</span></a></li><li class="devsite-nav-item"><a href="#BIND_SCREENING_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.34"><span class="devsite-nav-text">BIND_SCREENING_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_TELECOM_CONNECTION_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.35"><span class="devsite-nav-text">BIND_TELECOM_CONNECTION_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_TEXT_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.36"><span class="devsite-nav-text">BIND_TEXT_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_TV_INPUT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.37"><span class="devsite-nav-text">BIND_TV_INPUT</span></a></li><li class="devsite-nav-item"><a href="#BIND_VISUAL_VOICEMAIL_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.38"><span class="devsite-nav-text">BIND_VISUAL_VOICEMAIL_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_VOICE_INTERACTION" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.39"><span class="devsite-nav-text">BIND_VOICE_INTERACTION</span></a></li><li class="devsite-nav-item"><a href="#BIND_VPN_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.40"><span class="devsite-nav-text">BIND_VPN_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_VR_LISTENER_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.41"><span class="devsite-nav-text">BIND_VR_LISTENER_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#BIND_WALLPAPER" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.42"><span class="devsite-nav-text">BIND_WALLPAPER</span></a></li><li class="devsite-nav-item"><a href="#BLUETOOTH" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.43"><span class="devsite-nav-text">BLUETOOTH</span></a></li><li class="devsite-nav-item"><a href="#BLUETOOTH_ADMIN" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.44"><span class="devsite-nav-text">BLUETOOTH_ADMIN</span></a></li><li class="devsite-nav-item"><a href="#BLUETOOTH_PRIVILEGED" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.45"><span class="devsite-nav-text">BLUETOOTH_PRIVILEGED</span></a></li><li class="devsite-nav-item"><a href="#BODY_SENSORS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.46"><span class="devsite-nav-text">BODY_SENSORS</span></a></li><li class="devsite-nav-item"><a href="#BROADCAST_PACKAGE_REMOVED" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.47"><span class="devsite-nav-text">BROADCAST_PACKAGE_REMOVED</span></a></li><li class="devsite-nav-item"><a href="#BROADCAST_SMS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.48"><span class="devsite-nav-text">BROADCAST_SMS</span></a></li><li class="devsite-nav-item"><a href="#BROADCAST_STICKY" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.49"><span class="devsite-nav-text">BROADCAST_STICKY</span></a></li><li class="devsite-nav-item"><a href="#BROADCAST_WAP_PUSH" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.50"><span class="devsite-nav-text">BROADCAST_WAP_PUSH</span></a></li><li class="devsite-nav-item"><a href="#CALL_COMPANION_APP" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.51"><span class="devsite-nav-text">CALL_COMPANION_APP</span></a></li><li class="devsite-nav-item"><a href="#CALL_PHONE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.52"><span class="devsite-nav-text">CALL_PHONE</span></a></li><li class="devsite-nav-item"><a href="#CALL_PRIVILEGED" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.53"><span class="devsite-nav-text">CALL_PRIVILEGED</span></a></li><li class="devsite-nav-item"><a href="#CAMERA" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.54"><span class="devsite-nav-text">CAMERA</span></a></li><li class="devsite-nav-item"><a href="#CAPTURE_AUDIO_OUTPUT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.55"><span class="devsite-nav-text">CAPTURE_AUDIO_OUTPUT</span></a></li><li class="devsite-nav-item"><a href="#CHANGE_COMPONENT_ENABLED_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.56"><span class="devsite-nav-text">CHANGE_COMPONENT_ENABLED_STATE</span></a></li><li class="devsite-nav-item"><a href="#CHANGE_CONFIGURATION" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.57"><span class="devsite-nav-text">CHANGE_CONFIGURATION</span></a></li><li class="devsite-nav-item"><a href="#CHANGE_NETWORK_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.58"><span class="devsite-nav-text">CHANGE_NETWORK_STATE</span></a></li><li class="devsite-nav-item"><a href="#CHANGE_WIFI_MULTICAST_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.59"><span class="devsite-nav-text">CHANGE_WIFI_MULTICAST_STATE</span></a></li><li class="devsite-nav-item"><a href="#CHANGE_WIFI_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.60"><span class="devsite-nav-text">CHANGE_WIFI_STATE</span></a></li><li class="devsite-nav-item"><a href="#CLEAR_APP_CACHE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.61"><span class="devsite-nav-text">CLEAR_APP_CACHE</span></a></li><li class="devsite-nav-item"><a href="#CONTROL_LOCATION_UPDATES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.62"><span class="devsite-nav-text">CONTROL_LOCATION_UPDATES</span></a></li><li class="devsite-nav-item"><a href="#DELETE_CACHE_FILES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.63"><span class="devsite-nav-text">DELETE_CACHE_FILES</span></a></li><li class="devsite-nav-item"><a href="#DELETE_PACKAGES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.64"><span class="devsite-nav-text">DELETE_PACKAGES</span></a></li><li class="devsite-nav-item"><a href="#DIAGNOSTIC" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.65"><span class="devsite-nav-text">DIAGNOSTIC</span></a></li><li class="devsite-nav-item"><a href="#DISABLE_KEYGUARD" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.66"><span class="devsite-nav-text">DISABLE_KEYGUARD</span></a></li><li class="devsite-nav-item"><a href="#DUMP" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.67"><span class="devsite-nav-text">DUMP</span></a></li><li class="devsite-nav-item"><a href="#EXPAND_STATUS_BAR" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.68"><span class="devsite-nav-text">EXPAND_STATUS_BAR</span></a></li><li class="devsite-nav-item"><a href="#FACTORY_TEST" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.69"><span class="devsite-nav-text">FACTORY_TEST</span></a></li><li class="devsite-nav-item"><a href="#FOREGROUND_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.70"><span class="devsite-nav-text">FOREGROUND_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#GET_ACCOUNTS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.71"><span class="devsite-nav-text">GET_ACCOUNTS</span></a></li><li class="devsite-nav-item"><a href="#GET_ACCOUNTS_PRIVILEGED" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.72"><span class="devsite-nav-text">GET_ACCOUNTS_PRIVILEGED</span></a></li><li class="devsite-nav-item"><a href="#GET_PACKAGE_SIZE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.73"><span class="devsite-nav-text">GET_PACKAGE_SIZE</span></a></li><li class="devsite-nav-item"><a href="#GET_TASKS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.74"><span class="devsite-nav-text">GET_TASKS</span></a></li><li class="devsite-nav-item"><a href="#GLOBAL_SEARCH" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.75"><span class="devsite-nav-text">GLOBAL_SEARCH</span></a></li><li class="devsite-nav-item"><a href="#INSTALL_LOCATION_PROVIDER" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.76"><span class="devsite-nav-text">INSTALL_LOCATION_PROVIDER</span></a></li><li class="devsite-nav-item"><a href="#INSTALL_PACKAGES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.77"><span class="devsite-nav-text">INSTALL_PACKAGES</span></a></li><li class="devsite-nav-item"><a href="#INSTALL_SHORTCUT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.78"><span class="devsite-nav-text">INSTALL_SHORTCUT</span></a></li><li class="devsite-nav-item"><a href="#INSTANT_APP_FOREGROUND_SERVICE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.79"><span class="devsite-nav-text">INSTANT_APP_FOREGROUND_SERVICE</span></a></li><li class="devsite-nav-item"><a href="#INTERNET" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.80"><span class="devsite-nav-text">INTERNET</span></a></li><li class="devsite-nav-item"><a href="#KILL_BACKGROUND_PROCESSES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.81"><span class="devsite-nav-text">KILL_BACKGROUND_PROCESSES</span></a></li><li class="devsite-nav-item"><a href="#LOCATION_HARDWARE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.82"><span class="devsite-nav-text">LOCATION_HARDWARE</span></a></li><li class="devsite-nav-item"><a href="#MANAGE_DOCUMENTS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.83"><span class="devsite-nav-text">MANAGE_DOCUMENTS</span></a></li><li class="devsite-nav-item"><a href="#MANAGE_OWN_CALLS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.84"><span class="devsite-nav-text">MANAGE_OWN_CALLS</span></a></li><li class="devsite-nav-item"><a href="#MASTER_CLEAR" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.85"><span class="devsite-nav-text">MASTER_CLEAR</span></a></li><li class="devsite-nav-item"><a href="#MEDIA_CONTENT_CONTROL" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.86"><span class="devsite-nav-text">MEDIA_CONTENT_CONTROL</span></a></li><li class="devsite-nav-item"><a href="#MODIFY_AUDIO_SETTINGS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.87"><span class="devsite-nav-text">MODIFY_AUDIO_SETTINGS</span></a></li><li class="devsite-nav-item"><a href="#MODIFY_PHONE_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.88"><span class="devsite-nav-text">MODIFY_PHONE_STATE</span></a></li><li class="devsite-nav-item"><a href="#MOUNT_FORMAT_FILESYSTEMS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.89"><span class="devsite-nav-text">MOUNT_FORMAT_FILESYSTEMS</span></a></li><li class="devsite-nav-item"><a href="#MOUNT_UNMOUNT_FILESYSTEMS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.90"><span class="devsite-nav-text">MOUNT_UNMOUNT_FILESYSTEMS</span></a></li><li class="devsite-nav-item"><a href="#NFC" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.91"><span class="devsite-nav-text">NFC</span></a></li><li class="devsite-nav-item"><a href="#NFC_TRANSACTION_EVENT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.92"><span class="devsite-nav-text">NFC_TRANSACTION_EVENT</span></a></li><li class="devsite-nav-item"><a href="#PACKAGE_USAGE_STATS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.93"><span class="devsite-nav-text">PACKAGE_USAGE_STATS</span></a></li><li class="devsite-nav-item"><a href="#PERSISTENT_ACTIVITY" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.94"><span class="devsite-nav-text">PERSISTENT_ACTIVITY</span></a></li><li class="devsite-nav-item"><a href="#PROCESS_OUTGOING_CALLS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.95"><span class="devsite-nav-text">PROCESS_OUTGOING_CALLS</span></a></li><li class="devsite-nav-item"><a href="#READ_CALENDAR" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.96"><span class="devsite-nav-text">READ_CALENDAR</span></a></li><li class="devsite-nav-item"><a href="#READ_CALL_LOG" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.97"><span class="devsite-nav-text">READ_CALL_LOG</span></a></li><li class="devsite-nav-item"><a href="#READ_CONTACTS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.98"><span class="devsite-nav-text">READ_CONTACTS</span></a></li><li class="devsite-nav-item"><a href="#READ_EXTERNAL_STORAGE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.99"><span class="devsite-nav-text">READ_EXTERNAL_STORAGE</span></a></li><li class="devsite-nav-item"><a href="#READ_INPUT_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.100"><span class="devsite-nav-text">READ_INPUT_STATE</span></a></li><li class="devsite-nav-item"><a href="#READ_LOGS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.101"><span class="devsite-nav-text">READ_LOGS</span></a></li><li class="devsite-nav-item"><a href="#READ_PHONE_NUMBERS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.102"><span class="devsite-nav-text">READ_PHONE_NUMBERS</span></a></li><li class="devsite-nav-item"><a href="#READ_PHONE_STATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.103"><span class="devsite-nav-text">READ_PHONE_STATE</span></a></li><li class="devsite-nav-item"><a href="#READ_SMS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.104"><span class="devsite-nav-text">READ_SMS</span></a></li><li class="devsite-nav-item"><a href="#READ_SYNC_SETTINGS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.105"><span class="devsite-nav-text">READ_SYNC_SETTINGS</span></a></li><li class="devsite-nav-item"><a href="#READ_SYNC_STATS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.106"><span class="devsite-nav-text">READ_SYNC_STATS</span></a></li><li class="devsite-nav-item"><a href="#READ_VOICEMAIL" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.107"><span class="devsite-nav-text">READ_VOICEMAIL</span></a></li><li class="devsite-nav-item"><a href="#REBOOT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.108"><span class="devsite-nav-text">REBOOT</span></a></li><li class="devsite-nav-item"><a href="#RECEIVE_BOOT_COMPLETED" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.109"><span class="devsite-nav-text">RECEIVE_BOOT_COMPLETED</span></a></li><li class="devsite-nav-item"><a href="#RECEIVE_MMS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.110"><span class="devsite-nav-text">RECEIVE_MMS</span></a></li><li class="devsite-nav-item"><a href="#RECEIVE_SMS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.111"><span class="devsite-nav-text">RECEIVE_SMS</span></a></li><li class="devsite-nav-item"><a href="#RECEIVE_WAP_PUSH" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.112"><span class="devsite-nav-text">RECEIVE_WAP_PUSH</span></a></li><li class="devsite-nav-item"><a href="#RECORD_AUDIO" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.113"><span class="devsite-nav-text">RECORD_AUDIO</span></a></li><li class="devsite-nav-item"><a href="#REORDER_TASKS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.114"><span class="devsite-nav-text">REORDER_TASKS</span></a></li><li class="devsite-nav-item"><a href="#REQUEST_COMPANION_RUN_IN_BACKGROUND" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.115"><span class="devsite-nav-text">REQUEST_COMPANION_RUN_IN_BACKGROUND</span></a></li><li class="devsite-nav-item"><a href="#REQUEST_COMPANION_USE_DATA_IN_BACKGROUND" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.116"><span class="devsite-nav-text" data-title="REQUEST_COMPANION_USE_DATA_IN_BACKGROUND">REQUEST_COMPANION_USE_DATA_IN_BACKGROUND</span></a></li><li class="devsite-nav-item"><a href="#REQUEST_DELETE_PACKAGES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.117"><span class="devsite-nav-text">REQUEST_DELETE_PACKAGES</span></a></li><li class="devsite-nav-item"><a href="#REQUEST_IGNORE_BATTERY_OPTIMIZATIONS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.118"><span class="devsite-nav-text">REQUEST_IGNORE_BATTERY_OPTIMIZATIONS</span></a></li><li class="devsite-nav-item"><a href="#REQUEST_INSTALL_PACKAGES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.119"><span class="devsite-nav-text">REQUEST_INSTALL_PACKAGES</span></a></li><li class="devsite-nav-item"><a href="#REQUEST_PASSWORD_COMPLEXITY" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.120"><span class="devsite-nav-text">REQUEST_PASSWORD_COMPLEXITY</span></a></li><li class="devsite-nav-item"><a href="#RESTART_PACKAGES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.121"><span class="devsite-nav-text">RESTART_PACKAGES</span></a></li><li class="devsite-nav-item"><a href="#SEND_RESPOND_VIA_MESSAGE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.122"><span class="devsite-nav-text">SEND_RESPOND_VIA_MESSAGE</span></a></li><li class="devsite-nav-item"><a href="#SEND_SMS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.123"><span class="devsite-nav-text">SEND_SMS</span></a></li><li class="devsite-nav-item"><a href="#SET_ALARM" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.124"><span class="devsite-nav-text">SET_ALARM</span></a></li><li class="devsite-nav-item"><a href="#SET_ALWAYS_FINISH" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.125"><span class="devsite-nav-text">SET_ALWAYS_FINISH</span></a></li><li class="devsite-nav-item"><a href="#SET_ANIMATION_SCALE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.126"><span class="devsite-nav-text">SET_ANIMATION_SCALE</span></a></li><li class="devsite-nav-item"><a href="#SET_DEBUG_APP" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.127"><span class="devsite-nav-text">SET_DEBUG_APP</span></a></li><li class="devsite-nav-item"><a href="#SET_PREFERRED_APPLICATIONS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.128"><span class="devsite-nav-text">SET_PREFERRED_APPLICATIONS</span></a></li><li class="devsite-nav-item"><a href="#SET_PROCESS_LIMIT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.129"><span class="devsite-nav-text">SET_PROCESS_LIMIT</span></a></li><li class="devsite-nav-item"><a href="#SET_TIME" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.130"><span class="devsite-nav-text">SET_TIME</span></a></li><li class="devsite-nav-item"><a href="#SET_TIME_ZONE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.131"><span class="devsite-nav-text">SET_TIME_ZONE</span></a></li><li class="devsite-nav-item"><a href="#SET_WALLPAPER" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.132"><span class="devsite-nav-text">SET_WALLPAPER</span></a></li><li class="devsite-nav-item"><a href="#SET_WALLPAPER_HINTS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.133"><span class="devsite-nav-text">SET_WALLPAPER_HINTS</span></a></li><li class="devsite-nav-item"><a href="#SIGNAL_PERSISTENT_PROCESSES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.134"><span class="devsite-nav-text">SIGNAL_PERSISTENT_PROCESSES</span></a></li><li class="devsite-nav-item"><a href="#SMS_FINANCIAL_TRANSACTIONS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.135"><span class="devsite-nav-text">SMS_FINANCIAL_TRANSACTIONS</span></a></li><li class="devsite-nav-item"><a href="#START_VIEW_PERMISSION_USAGE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.136"><span class="devsite-nav-text">START_VIEW_PERMISSION_USAGE</span></a></li><li class="devsite-nav-item"><a href="#STATUS_BAR" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.137"><span class="devsite-nav-text">STATUS_BAR</span></a></li><li class="devsite-nav-item"><a href="#SYSTEM_ALERT_WINDOW" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.138"><span class="devsite-nav-text">SYSTEM_ALERT_WINDOW</span></a></li><li class="devsite-nav-item"><a href="#TRANSMIT_IR" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.139"><span class="devsite-nav-text">TRANSMIT_IR</span></a></li><li class="devsite-nav-item"><a href="#UNINSTALL_SHORTCUT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.140"><span class="devsite-nav-text">UNINSTALL_SHORTCUT</span></a></li><li class="devsite-nav-item"><a href="#UPDATE_DEVICE_STATS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.141"><span class="devsite-nav-text">UPDATE_DEVICE_STATS</span></a></li><li class="devsite-nav-item"><a href="#USE_BIOMETRIC" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.142"><span class="devsite-nav-text">USE_BIOMETRIC</span></a></li><li class="devsite-nav-item"><a href="#USE_FINGERPRINT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.143"><span class="devsite-nav-text">USE_FINGERPRINT</span></a></li><li class="devsite-nav-item"><a href="#USE_FULL_SCREEN_INTENT" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.144"><span class="devsite-nav-text">USE_FULL_SCREEN_INTENT</span></a></li><li class="devsite-nav-item"><a href="#USE_SIP" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.145"><span class="devsite-nav-text">USE_SIP</span></a></li><li class="devsite-nav-item"><a href="#VIBRATE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.146"><span class="devsite-nav-text">VIBRATE</span></a></li><li class="devsite-nav-item"><a href="#WAKE_LOCK" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.147"><span class="devsite-nav-text">WAKE_LOCK</span></a></li><li class="devsite-nav-item"><a href="#WRITE_APN_SETTINGS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.148"><span class="devsite-nav-text">WRITE_APN_SETTINGS</span></a></li><li class="devsite-nav-item"><a href="#WRITE_CALENDAR" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.149"><span class="devsite-nav-text">WRITE_CALENDAR</span></a></li><li class="devsite-nav-item"><a href="#WRITE_CALL_LOG" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.150"><span class="devsite-nav-text">WRITE_CALL_LOG</span></a></li><li class="devsite-nav-item"><a href="#WRITE_CONTACTS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.151"><span class="devsite-nav-text">WRITE_CONTACTS</span></a></li><li class="devsite-nav-item"><a href="#WRITE_EXTERNAL_STORAGE" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.152"><span class="devsite-nav-text">WRITE_EXTERNAL_STORAGE</span></a></li><li class="devsite-nav-item"><a href="#WRITE_GSERVICES" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.153"><span class="devsite-nav-text">WRITE_GSERVICES</span></a></li><li class="devsite-nav-item"><a href="#WRITE_SECURE_SETTINGS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.154"><span class="devsite-nav-text">WRITE_SECURE_SETTINGS</span></a></li><li class="devsite-nav-item"><a href="#WRITE_SETTINGS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.155"><span class="devsite-nav-text">WRITE_SETTINGS</span></a></li><li class="devsite-nav-item"><a href="#WRITE_SYNC_SETTINGS" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.156"><span class="devsite-nav-text">WRITE_SYNC_SETTINGS</span></a></li><li class="devsite-nav-item"><a href="#WRITE_VOICEMAIL" class="devsite-nav-title gc-analytics-event" data-category="Site-Wide Custom Events" data-action="click" data-label="Right nav" data-value="1.157"><span class="devsite-nav-text">WRITE_VOICEMAIL</span></a></li>'
 
@@ -10,40 +14,46 @@ PAGE = '<li class="devsite-nav-item"><a href="#ACCEPT_HANDOVER" class="devsite-n
 def main(argv):
     with open("apps/data/appinfo.csv", "w", encoding="utf8") as csvfile:
         file = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        file.writerow(
-            ['Pkgname', 'backendPkgname', 'Title', 'Description', 'ShortDescription', 'Url', 'RelatedAppsLink',
-             'RelatedApps', 'Genre', 'Type', 'Price', 'CurrencyCode', 'Downloads', 'PGRating', 'AverageRating',
-             'RatingCount', 'FiveStarRatings', 'FourStarRatings', 'ThreeStarRatings', 'TwoStarRatings',
-             'OneStarRatings', 'DeveloperAddress', 'DeveloperEmail', 'DeveloperWebsite', 'developerName', 'Creator',
-             'PrivacyPolicyLink', 'CurrentVersion', 'CurrentVersionString', 'LastUpdated', 'recentChanges',
-             'AndroidVersion', 'FileSize', 'isUnstable', 'hasInstantLink', 'containsAds'])
+        file.writerow(column_names(APPINFO))
         csvfile.close()
 
     with open("apps/data/externalpermissions.csv", "w", encoding="utf8") as csvfile:
         file = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        file.writerow(["Pkgname", "ExternalPermissions"])
+        file.writerow(column_names(EXTERNAL_PERMISSIONS))
         csvfile.close()
 
     with open("apps/data/images.csv", "w", encoding="utf8") as csvfile:
         file = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        file.writerow(["Pkgname", "ImageUrls"])
+        file.writerow(column_names(IMAGES))
         csvfile.close()
 
     tree = html.fromstring(PAGE)
     permissions = tree.xpath('//span[@class="devsite-nav-text"]/text()')
-    permissions = ["Pkgname"] + ["android.permission." + p for p in permissions]
+    permissions = column_names(PERMISSIONS, ["android.permission." + p for p in permissions])
 
     with open("apps/data/permissions.csv", "w", encoding="utf8") as csvfile:
         file = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
         file.writerow(permissions)
         csvfile.close()
 
+    with open("apps/data/permissionbits.csv", "w", encoding="utf8") as csvfile:
+        file = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        file.writerow(column_names(PERMISSION_BITS))
+        csvfile.close()
+
     with open("apps/data/reviews.csv", "w", encoding="utf8") as csvfile:
         file = csv.writer(csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        file.writerow(
-            ['Pkgname', 'documentVersion', 'timestampMsec', 'starRating', 'comment', 'personId', 'name', 'image'])
+        file.writerow(column_names(REVIEWS))
         csvfile.close()
 
+    # the folders of the parquet output and the database of the sqlite output
+    for table in TABLES:
+        if os.path.isdir(os.path.join("apps/data", table)):
+            shutil.rmtree(os.path.join("apps/data", table))
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(os.path.join("apps/data", OUTPUT_DATABASE + suffix)):
+            os.remove(os.path.join("apps/data", OUTPUT_DATABASE + suffix))
+
 
 if __name__ == "__main__":
     main(sys.argv[1:])
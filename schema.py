@@ -0,0 +1,61 @@
+STRING = 'string'
+INT = 'int'
+FLOAT = 'float'
+BOOL = 'bool'
+
+APPINFO = 'appinfo'  # the details of the apps
+PERMISSIONS = 'permissions'  # a 0 or 1 column for every permission of the template
+PERMISSION_BITS = 'permissionbits'  # the permissions of the apps as a hex bitset
+EXTERNAL_PERMISSIONS = 'externalpermissions'  # the permissions of the apps that are not android permissions
+IMAGES = 'images'  # the image urls of the apps
+REVIEWS = 'reviews'  # the reviews of the apps
+TABLES = (APPINFO, PERMISSIONS, PERMISSION_BITS, EXTERNAL_PERMISSIONS, IMAGES, REVIEWS)
+
+# the (name, type) of the columns of every table, the columns of PERMISSIONS follow the permission template
+COLUMNS = {
+    APPINFO: [('Pkgname', STRING), ('backendPkgname', STRING), ('Title', STRING), ('Description', STRING),
+              ('ShortDescription', STRING), ('Url', STRING), ('RelatedAppsLink', STRING), ('RelatedApps', STRING),
+              ('Genre', STRING), ('Type', STRING), ('Price', INT), ('CurrencyCode', STRING), ('Downloads', STRING),
+              ('PGRating', STRING), ('AverageRating', FLOAT), ('RatingCount', INT), ('FiveStarRatings', INT),
+              ('FourStarRatings', INT), ('ThreeStarRatings', INT), ('TwoStarRatings', INT), ('OneStarRatings', INT),
+              ('DeveloperAddress', STRING), ('DeveloperEmail', STRING), ('DeveloperWebsite', STRING),
+              ('developerName', STRING), ('Creator', STRING), ('PrivacyPolicyLink', STRING),
+              ('CurrentVersion', INT), ('CurrentVersionString', STRING), ('LastUpdated', STRING),
+              ('recentChanges', STRING), ('AndroidVersion', STRING), ('FileSize', INT), ('isUnstable', BOOL),
+              ('hasInstantLink', BOOL), ('containsAds', STRING)],
+    PERMISSION_BITS: [('Pkgname', STRING), ('Permissions', STRING)],
+    EXTERNAL_PERMISSIONS: [('Pkgname', STRING), ('ExternalPermissions', STRING)],
+    IMAGES: [('Pkgname', STRING), ('ImageUrls', STRING)],
+    REVIEWS: [('Pkgname', STRING), ('documentVersion', STRING), ('timestampMsec', INT), ('starRating', INT),
+              ('comment', STRING), ('personId', STRING), ('name', STRING), ('image', STRING)],
+}
+
+# the extra column the sqlite output keys a table on next to Pkgname, which the other formats leave out:
+# the tables about an app are keyed on the version of the app, like appinfo, and reviews on the id of the review
+KEY_COLUMNS = {
+    PERMISSIONS: ('CurrentVersion', INT),
+    PERMISSION_BITS: ('CurrentVersion', INT),
+    EXTERNAL_PERMISSIONS: ('CurrentVersion', INT),
+    IMAGES: ('CurrentVersion', INT),
+    REVIEWS: ('commentId', STRING),
+}
+
+
+def columns(table, permissions=()):
+    """
+    :param table: one of TABLES
+    :param permissions: the permissions of the template, for the PERMISSIONS table
+    :return: a list of (name, type) tuples of the columns of the table
+    """
+
+    if table == PERMISSIONS:
+        return [('Pkgname', STRING)] + [(permission, INT) for permission in permissions]
+    return COLUMNS[table]
+
+
+def column_names(table, permissions=()):
+    """
+    :return: the names of the columns of the table, the header of its .csv file
+    """
+
+    return [name for name, _ in columns(table, permissions)]
@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+from urllib.parse import parse_qs
+
+from aiohttp import web
+
+import apkfetch_pb2
+import asyncgoogleplaycrawler
+from asyncgoogleplaycrawler import AsyncGooglePlayCrawler
+
+
+class RequestServiceTest(unittest.TestCase):
+
+    def test_login_body_is_form_encoded(self):
+        requests = []
+
+        async def handle(request):
+            requests.append((request.headers.get('Content-Type'), await request.read()))
+            return web.Response(text='SID=sid\nAuth=auth\nToken=token\n')
+
+        async def login():
+            app = web.Application()
+            app.router.add_post('/auth', handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+
+            login_url = asyncgoogleplaycrawler.GOOGLE_LOGIN_URL
+            asyncgoogleplaycrawler.GOOGLE_LOGIN_URL = 'http://127.0.0.1:{}/auth'.format(port)
+            try:
+                async with AsyncGooglePlayCrawler() as apk:
+                    apk.user, apk.password, apk.android_id = 'user@example.com', 'password', '1234'
+                    return await apk.request_service('ac2dm', 'com.google.android.gsf')
+            finally:
+                asyncgoogleplaycrawler.GOOGLE_LOGIN_URL = login_url
+                await runner.cleanup()
+
+        self.assertEqual(asyncio.run(login()), ('token', 'auth'))
+
+        content_type, body = requests[0]
+        self.assertEqual(content_type, 'application/x-www-form-urlencoded')
+        form = parse_qs(body.decode('ascii'), strict_parsing=True)
+        self.assertEqual(form['Email'], ['user@example.com'])
+        self.assertEqual(form['service'], ['ac2dm'])
+        self.assertEqual(form['androidId'], ['1234'])
+        self.assertFalse(form['EncryptedPasswd'][0].startswith("b'"))
+
+
+class BulkDetailsTest(unittest.TestCase):
+
+    def test_entries_are_matched_on_docid(self):
+        async def handle(request):
+            bulk_request = apkfetch_pb2.BulkDetailsRequest()
+            bulk_request.ParseFromString(await request.read())
+            response = apkfetch_pb2.ResponseWrapper()
+            # the server leaves out the apps it does not know and returns the others in another order
+            for docid in reversed(bulk_request.docid):
+                if docid != 'com.example.missing':
+                    response.payload.bulkDetailsResponse.entry.add().doc.docid = docid
+            response.payload.bulkDetailsResponse.entry.add()
+            return web.Response(body=response.SerializeToString())
+
+        async def bulk_details(package_names):
+            app = web.Application()
+            app.router.add_post('/bulkDetails', handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+
+            bulk_details_url = asyncgoogleplaycrawler.GOOGLE_BULKDETAILS_URL
+            asyncgoogleplaycrawler.GOOGLE_BULKDETAILS_URL = 'http://127.0.0.1:{}/bulkDetails'.format(port)
+            try:
+                async with AsyncGooglePlayCrawler() as apk:
+                    apk.android_id, apk.auth = '1234', 'auth'
+                    return await apk.bulk_details(package_names)
+            finally:
+                asyncgoogleplaycrawler.GOOGLE_BULKDETAILS_URL = bulk_details_url
+                await runner.cleanup()
+
+        package_names = ['com.example.a', 'com.example.missing', 'com.example.b', 'com.example.c']
+        details = asyncio.run(bulk_details(package_names))
+
+        self.assertEqual(sorted(details), sorted(package_names))
+        self.assertIsNone(details['com.example.missing'])
+        for package_name in ('com.example.a', 'com.example.b', 'com.example.c'):
+            self.assertEqual(details[package_name].docid, package_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from checkpoint import Checkpoint
+from frontier import BFS
+from test_frontier import FakeCrawler
+
+
+class Crash(BaseException):
+    """
+    stops a crawl like a kill would, the crawler does not catch it
+    """
+
+
+class CrashingCrawler(FakeCrawler):
+
+    def __init__(self, crash_on):
+        super(CrashingCrawler, self).__init__()
+        self.crash_on = crash_on
+
+    def try_visit_app(self, package_name, details=None):
+        if package_name == self.crash_on:
+            raise Crash()
+        return super(CrashingCrawler, self).try_visit_app(package_name, details)
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'checkpoint.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_load(self):
+        checkpoint = Checkpoint(self.path)
+        checkpoint.start(BFS, 10, 0)
+        checkpoint.scheduled([('a', 0)])
+        checkpoint.popped(['a'])
+        checkpoint.finished('a')
+        checkpoint.scheduled([('b', 2), ('c', 1)])
+        checkpoint.popped(['b'])
+        checkpoint.commit(2)
+        # changes after the last commit are lost
+        checkpoint.finished('b')
+        checkpoint.scheduled([('d', 1)])
+        checkpoint.close()
+
+        checkpoint = Checkpoint(self.path)
+        state = checkpoint.load()
+        self.assertEqual(state, {'order': BFS, 'max_iterations': 10, 'iteration': 1, 'finished': False,
+                                 'frontier': [('b', 2), ('c', 1)]})
+        self.assertEqual(sorted(checkpoint.visited()), ['a', 'b', 'c'])
+
+        # loading again before a commit does not take the apps that were being visited off the iteration twice
+        self.assertEqual(checkpoint.load()['iteration'], 1)
+        checkpoint.close()
+
+    def test_nothing_to_resume(self):
+        checkpoint = Checkpoint(self.path)
+        with self.assertRaises(Exception):
+            checkpoint.load()
+        checkpoint.close()
+
+    def test_resume_crawl(self):
+        expected = ['a', 'a.0', 'a.1', 'a.2', 'a.0.0', 'a.0.1', 'a.0.2', 'a.1.0', 'a.1.1', 'a.1.2']
+
+        checkpoint = Checkpoint(self.path, interval=0)
+        crawler = CrashingCrawler('a.0.0')
+        with self.assertRaises(Crash):
+            crawler.crawl('a', max_iterations=10, order=BFS, workers=1, checkpoint=checkpoint)
+        crawler.close()
+        checkpoint.close()
+        self.assertEqual(crawler.visited, expected[:4])
+
+        checkpoint = Checkpoint(self.path, interval=0)
+        crawler = FakeCrawler()
+        crawler.resume_crawl(checkpoint, workers=1)
+        crawler.close()
+        # the app that was being visited when the crawl stopped is visited again
+        self.assertEqual(crawler.visited, expected[4:])
+        self.assertEqual(crawler.iter, 10)
+        self.assertTrue(checkpoint.load()['finished'])
+        self.assertEqual(sorted(checkpoint.visited()), sorted(expected))
+        checkpoint.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+import io
+import os
+import gzip
+import shutil
+import hashlib
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from downloader import Downloader, apply_gdiff, GDIFF_HEADER, GDIFF
+
+
+class FileServer(ThreadingHTTPServer):
+    """
+    serves files from memory and answers Range requests. the first response for a path in cut_off only sends
+    the first half of the file, like a download that is interrupted
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FileHandler)
+        self.files = {}
+        self.cut_off = set()
+        self.requests = []
+
+    def url(self, path):
+        return 'http://127.0.0.1:{}{}'.format(self.server_address[1], path)
+
+
+class FileHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('Range')))
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+
+        start = 0
+        if self.headers.get('Range'):
+            start = int(self.headers['Range'][len('bytes='):].rstrip('-'))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', 'bytes */{}'.format(len(data)))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, len(data) - 1, len(data)))
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+
+        if self.path in self.server.cut_off:
+            self.server.cut_off.discard(self.path)
+            self.wfile.write(data[start:len(data) // 2])
+            self.close_connection = True
+        else:
+            self.wfile.write(data[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ApplyGdiffTest(unittest.TestCase):
+
+    def patch(self, source, patch):
+        written = []
+        apply_gdiff(io.BytesIO(source), io.BytesIO(patch), written.append, block_size=4)
+        return b''.join(written)
+
+    def test_commands(self):
+        source = b'0123456789abcdefghij'
+        patch = (GDIFF_HEADER +
+                 b'\x03new' +  # 3 bytes of data
+                 b'\xf9\x00\x0a\x06' +  # copy 6 bytes from offset 10, 2 byte offset and 1 byte length
+                 b'\xf7\x00\x02!!' +  # 2 bytes of data with a 2 byte length
+                 b'\xfc\x00\x00\x00\x00\x0a' +  # copy 10 bytes from offset 0, 4 byte offset and 1 byte length
+                 b'\xf8\x00\x00\x00\x01.' +  # 1 byte of data with a 4 byte length
+                 b'\x00')
+        self.assertEqual(self.patch(source, patch), b'newabcdef!!0123456789.')
+
+    def test_not_a_gdiff_file(self):
+        with self.assertRaises(IOError):
+            self.patch(b'source', b'\x00' * 8)
+
+    def test_truncated_patch(self):
+        with self.assertRaises(IOError):
+            self.patch(b'source', GDIFF_HEADER + b'\x05new')
+
+    def test_copy_past_the_end(self):
+        with self.assertRaises(IOError):
+            self.patch(b'source', GDIFF_HEADER + b'\xf9\x00\x04\x06\x00')
+
+
+class DownloaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FileServer()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'app.apk')
+        self.downloader = Downloader(chunk_size=1024, retries=1)
+
+        self.data = os.urandom(64 * 1024)
+        self.sha1 = hashlib.sha1(self.data).hexdigest()
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+        self.server.files['/app.apk'] = self.data
+
+    def tearDown(self):
+        self.downloader.close()
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.folder)
+
+    def read(self):
+        with open(self.path, 'rb') as fp:
+            return fp.read()
+
+    def test_download(self):
+        result = self.downloader.download(self.server.url('/app.apk'), self.path, len(self.data), self.sha1,
+                                          self.sha256)
+
+        self.assertEqual(result, {'size': len(self.data), 'sha1': self.sha1, 'sha256': self.sha256})
+        self.assertEqual(self.read(), self.data)
+        self.assertFalse(os.path.exists(self.path + '.part'))
+
+    def test_resume_part_file(self):
+        with open(self.path + '.part', 'wb') as fp:
+            fp.write(self.data[:1000])
+
+        result = self.downloader.download(self.server.url('/app.apk'), self.path, len(self.data), self.sha1)
+
+        self.assertEqual(result['sha256'], self.sha256)
+        self.assertEqual(self.read(), self.data)
+        self.assertEqual(self.server.requests, [('/app.apk', 'bytes=1000-')])
+
+    def test_resume_interrupted_download(self):
+        self.server.cut_off.add('/app.apk')
+
+        result = self.downloader.download(self.server.url('/app.apk'), self.path, len(self.data), self.sha1)
+
+        self.assertEqual(result['sha1'], self.sha1)
+        self.assertEqual(self.read(), self.data)
+        resumed = 'bytes={}-'.format(len(self.data) // 2)
+        self.assertEqual(self.server.requests, [('/app.apk', None), ('/app.apk', resumed)])
+
+    def test_complete_part_file(self):
+        with open(self.path + '.part', 'wb') as fp:
+            fp.write(self.data)
+
+        result = self.downloader.download(self.server.url('/app.apk'), self.path, None, self.sha1)
+
+        self.assertEqual(result['size'], len(self.data))
+        self.assertEqual(self.read(), self.data)
+
+    def test_gzip(self):
+        data = b'compressible ' * 10000
+        gzipped = gzip.compress(data)
+        self.server.files['/app.apk.gz'] = gzipped
+
+        result = self.downloader.download(self.server.url('/app.apk'), self.path, len(data),
+                                          hashlib.sha1(data).hexdigest(), gzip_url=self.server.url('/app.apk.gz'),
+                                          gzip_size=len(gzipped))
+
+        self.assertEqual(result['sha256'], hashlib.sha256(data).hexdigest())
+        self.assertEqual(self.read(), data)
+        self.assertEqual(self.server.requests, [('/app.apk.gz', None)])
+
+    def test_interrupted_gzip_resumes_uncompressed(self):
+        data = os.urandom(8 * 1024) * 8
+        gzipped = gzip.compress(data)
+        self.server.files['/app.apk'] = data
+        self.server.files['/app.apk.gz'] = gzipped
+        self.server.cut_off.add('/app.apk.gz')
+
+        result = self.downloader.download(self.server.url('/app.apk'), self.path, len(data),
+                                          hashlib.sha1(data).hexdigest(), gzip_url=self.server.url('/app.apk.gz'),
+                                          gzip_size=len(gzipped))
+
+        self.assertIsNotNone(result)
+        self.assertEqual(self.read(), data)
+        self.assertEqual(self.server.requests[0], ('/app.apk.gz', None))
+        self.assertEqual(self.server.requests[1][0], '/app.apk')
+        self.assertIsNotNone(self.server.requests[1][1])
+
+    def test_digest_mismatch(self):
+        result = self.downloader.download(self.server.url('/app.apk'), self.path, len(self.data),
+                                          hashlib.sha1(b'another file').hexdigest())
+
+        self.assertIsNone(result)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.part'))
+        # the corrupt file is downloaded again from the start
+        self.assertEqual(self.server.requests, [('/app.apk', None), ('/app.apk', None)])
+
+    def test_patch(self):
+        base = self.data[:32 * 1024]
+        with open(self.path, 'wb') as fp:
+            fp.write(base)
+        tail = self.data[32 * 1024:]
+        self.server.files['/app.patch'] = (GDIFF_HEADER + b'\xfb\x00\x00' + len(base).to_bytes(4, 'big') +
+                                           b'\xf8' + len(tail).to_bytes(4, 'big') + tail + b'\x00')
+
+        result = self.downloader.patch(self.path, self.server.url('/app.patch'), self.path, GDIFF, len(self.data),
+                                       self.sha1, self.sha256)
+
+        self.assertEqual(result['sha1'], self.sha1)
+        self.assertEqual(self.read(), self.data)
+        self.assertEqual(sorted(os.listdir(self.folder)), ['app.apk'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+
+import apkfetch_pb2
+from frontier import Frontier, BFS, DFS, PRIORITY
+from googleplaycrawler import GooglePlayCrawler
+
+
+class FrontierTest(unittest.TestCase):
+
+    def pop_all(self, frontier):
+        popped = []
+        while frontier:
+            self.assertEqual(frontier.peek(), [frontier.peek(3)[0]])
+            popped.append(frontier.pop())
+        return popped
+
+    def test_orders(self):
+        apps = [('a', 1), ('b', 3), ('c', 2), ('d', 3)]
+        for order, expected in ((BFS, ['a', 'b', 'c', 'd']), (DFS, ['a', 'b', 'c', 'd']),
+                                (PRIORITY, ['b', 'd', 'c', 'a'])):
+            frontier = Frontier(order)
+            self.assertEqual(frontier.extend(apps), ['a', 'b', 'c', 'd'])
+            self.assertEqual(frontier.peek(10), expected)
+            self.assertEqual(self.pop_all(frontier), expected)
+
+    def test_dfs_visits_the_last_discovered_apps_first(self):
+        frontier = Frontier(DFS)
+        frontier.extend([('a', 0), ('b', 0)])
+        self.assertEqual(frontier.pop(), 'a')
+        frontier.extend([('a.0', 0), ('a.1', 0)])
+        self.assertEqual(self.pop_all(frontier), ['a.0', 'a.1', 'b'])
+
+    def test_max_size(self):
+        frontier = Frontier(BFS, max_size=2)
+        self.assertEqual(frontier.extend([('a', 0), ('b', 0), ('c', 0)]), ['a', 'b'])
+        self.assertEqual(frontier.dropped, 1)
+
+
+class FakeWriter(object):
+
+    def close(self):
+        pass
+
+
+class FakeCrawler(GooglePlayCrawler):
+    """
+    a crawler in which every app has CHILDREN related apps named <app>.<i>, with the priority of PRIORITIES[i]
+    """
+
+    CHILDREN = 3
+    PRIORITIES = (1, 5, 3)
+
+    def __init__(self):
+        super(FakeCrawler, self).__init__(writer=FakeWriter())
+        self.visited = []
+        self.bulk_requests = []
+
+    def prefetch_details(self, package_names):
+        self.bulk_requests.append(list(package_names))
+        return {}
+
+    def try_visit_app(self, package_name, details=None):
+        self.visited.append(package_name)
+        related_apps = []
+        for i in range(self.CHILDREN):
+            app = apkfetch_pb2.DocV2()
+            app.docid = package_name + '.' + str(i)
+            app.aggregateRating.ratingsCount = self.PRIORITIES[i]
+            related_apps.append(app)
+        return related_apps
+
+
+class CrawlOrderTest(unittest.TestCase):
+
+    def crawl(self, order, iterations=10):
+        crawler = FakeCrawler()
+        try:
+            crawler.crawl('a', max_iterations=iterations, order=order, workers=1)
+        finally:
+            crawler.close()
+        self.assertEqual(len(crawler.visited), iterations)
+        self.assertEqual(len(set(crawler.visited)), iterations)
+        return crawler
+
+    def test_dfs(self):
+        self.assertEqual(self.crawl(DFS).visited, ['a', 'a.0', 'a.0.0', 'a.0.0.0', 'a.0.0.1', 'a.0.0.2',
+                                                   'a.0.1', 'a.0.2', 'a.1', 'a.2'])
+
+    def test_bfs(self):
+        self.assertEqual(self.crawl(BFS).visited, ['a', 'a.0', 'a.1', 'a.2', 'a.0.0', 'a.0.1', 'a.0.2',
+                                                   'a.1.0', 'a.1.1', 'a.1.2'])
+
+    def test_priority(self):
+        # the apps found by a visit go before the ones with a lower priority that were found earlier,
+        # apps with the same priority go in the order they were found
+        self.assertEqual(self.crawl(PRIORITY).visited, ['a', 'a.1', 'a.1.1', 'a.1.1.1', 'a.2', 'a.1.2',
+                                                        'a.1.1.2', 'a.0', 'a.1.0', 'a.1.1.0'])
+
+    def test_details_are_fetched_ahead_once(self):
+        crawler = self.crawl(BFS)
+        requested = [package for request in crawler.bulk_requests for package in request]
+        self.assertEqual(len(requested), len(set(requested)))
+        self.assertTrue(set(crawler.visited[1:]) <= set(requested))
+
+
+if __name__ == '__main__':
+    unittest.main()
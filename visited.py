@@ -0,0 +1,178 @@
+import math
+import mmap
+import struct
+import hashlib
+
+MEMORY = 'memory'  # a plain python set, exact but every package name is kept in memory
+INDEX = 'index'  # an on-disk hash index of 8 byte package hashes, exact up to hash collisions
+BLOOM = 'bloom'  # an in-memory bloom filter, very compact but with a small false positive rate
+KINDS = (MEMORY, INDEX, BLOOM)
+
+
+def hash_package(package_name, digest_size=8):
+    return hashlib.blake2b(package_name.encode('utf8'), digest_size=digest_size).digest()
+
+
+class MemoryVisitedSet(object):
+    """
+    keeps track of the visited apps using a python set
+    """
+
+    def __init__(self, packages=()):
+        self.packages = set(packages)
+
+    def __contains__(self, package_name):
+        return package_name in self.packages
+
+    def __len__(self):
+        return len(self.packages)
+
+    def add(self, package_name):
+        self.packages.add(package_name)
+
+    def update(self, package_names):
+        self.packages.update(package_names)
+
+    def close(self):
+        pass
+
+
+class HashIndexVisitedSet(object):
+    """
+    keeps track of the visited apps in an open addressing hash table of 64 bit package hashes,
+    stored in a memory mapped file. the table doubles in size when it is half full.
+    the file only keeps the table out of memory, it is a scratch file that is emptied when the set is created.
+    the output stays the record of the visited apps, so the set is filled from it on every start
+    """
+
+    SLOT = struct.Struct('<Q')
+
+    def __init__(self, path, capacity=1 << 20):
+        self.path = path
+        self.size = 0
+        self.slots = 1
+        while self.slots < capacity * 2:
+            self.slots *= 2
+        # a table left by an earlier run is not reused, it would not know about the output being reset
+        self.file = open(self.path, 'w+b')
+        self.file.truncate(self.slots * self.SLOT.size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+    @classmethod
+    def _hash(cls, package_name):
+        # 0 marks an empty slot
+        return cls.SLOT.unpack(hash_package(package_name))[0] or 1
+
+    def _find(self, package_hash):
+        """
+        :return: the slot the hash is stored in, or the empty slot it should be stored in
+        """
+
+        mask = self.slots - 1
+        i = package_hash & mask
+        while True:
+            value = self.SLOT.unpack_from(self.map, i * self.SLOT.size)[0]
+            if value == 0 or value == package_hash:
+                return i, value
+            i = (i + 1) & mask
+
+    def __contains__(self, package_name):
+        package_hash = self._hash(package_name)
+        return self._find(package_hash)[1] == package_hash
+
+    def __len__(self):
+        return self.size
+
+    def add(self, package_name):
+        package_hash = self._hash(package_name)
+        i, value = self._find(package_hash)
+        if value == package_hash:
+            return
+
+        self.SLOT.pack_into(self.map, i * self.SLOT.size, package_hash)
+        self.size += 1
+        if self.size * 2 > self.slots:
+            self._grow()
+
+    def update(self, package_names):
+        for package_name in package_names:
+            self.add(package_name)
+
+    def _grow(self):
+        old_table, old_slots = self.map[:], self.slots
+
+        self.map.close()
+        self.slots *= 2
+        self.file.seek(0)
+        self.file.truncate(0)
+        self.file.truncate(self.slots * self.SLOT.size)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+
+        for offset in range(0, old_slots * self.SLOT.size, self.SLOT.size):
+            package_hash = self.SLOT.unpack_from(old_table, offset)[0]
+            if package_hash:
+                i = self._find(package_hash)[0]
+                self.SLOT.pack_into(self.map, i * self.SLOT.size, package_hash)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class BloomVisitedSet(object):
+    """
+    keeps track of the visited apps using a bloom filter. a package that was never visited
+    is reported as visited with a chance of about error_rate once capacity packages are added
+    """
+
+    def __init__(self, capacity=10000000, error_rate=0.001):
+        self.bits_count = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, int(round(float(self.bits_count) / capacity * math.log(2))))
+        self.bits = bytearray((self.bits_count + 7) // 8)
+        self.size = 0
+
+    def _positions(self, package_name):
+        h1, h2 = struct.unpack('<QQ', hash_package(package_name, 16))
+        return [(h1 + i * h2) % self.bits_count for i in range(self.hash_count)]
+
+    def __contains__(self, package_name):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(package_name))
+
+    def __len__(self):
+        return self.size
+
+    def add(self, package_name):
+        added = False
+        for p in self._positions(package_name):
+            if not self.bits[p >> 3] & (1 << (p & 7)):
+                self.bits[p >> 3] |= 1 << (p & 7)
+                added = True
+
+        if added:
+            self.size += 1
+
+    def update(self, package_names):
+        for package_name in package_names:
+            self.add(package_name)
+
+    def close(self):
+        pass
+
+
+def create_visited_set(kind=MEMORY, index_path=None, capacity=10000000, error_rate=0.001):
+    """
+    create an empty visited set
+    :param kind: the kind of visited set, one of KINDS
+    :param index_path: the file to store the hash index in, only used by INDEX
+    :param capacity: the amount of apps the bloom filter is sized for, only used by BLOOM
+    :param error_rate: the false positive rate of the bloom filter at capacity, only used by BLOOM
+    :return: the visited set
+    """
+
+    if kind == MEMORY:
+        return MemoryVisitedSet()
+    elif kind == INDEX:
+        return HashIndexVisitedSet(index_path)
+    elif kind == BLOOM:
+        return BloomVisitedSet(capacity, error_rate)
+    raise ValueError('unknown visited set: ' + str(kind) + '. pick one of: ' + ", ".join(KINDS))